@@ -0,0 +1,324 @@
+"""
+Head to head timings of alternative implementations on generated inputs.
+
+Each comparison runs every variant on the same input, checks that they all
+agree (after `normalise`) and reports the best of `repeats` runs. `prepare`
+turns the input path into each variant's argument outside of the timing, so
+solvers can be compared without their parser.
+"""
+
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from gen_inputs import write_input
+from utils import PARSE_CACHE_ENABLE_ENV
+
+Variant = Callable[[Any], Any]
+
+
+@dataclass
+class Comparison:
+    day: int
+    sizes: list[int]
+    variants: dict[str, Variant]
+    normalise: Callable[[Any], Any] = field(default=lambda res: res)
+    prepare: Callable[[Path], Any] = field(default=lambda path: path)
+
+
+def day1_parsers() -> Comparison:
+    import day1
+
+    def as_lists(res: Any) -> Any:
+        return [list(map(int, col)) for col in res]
+
+    return Comparison(
+        1,
+        [10_000, 100_000, 1_000_000],
+        {
+            "line loop": day1.read_to_list_pairs,
+            "chunked": day1.read_to_arrays,
+            "bulk": day1.bulk_read_to_arrays,
+        },
+        as_lists,
+    )
+
+
+def day2_safety() -> Comparison:
+    import day2
+
+    def tolerant(count_fn: Callable[..., int]) -> Variant:
+        return lambda levels: count_fn(levels, error_allowed=True)
+
+    return Comparison(
+        2,
+        [1_000, 10_000, 100_000],
+        {
+            "brute": tolerant(day2.monotonic_within_jump_num_sat),
+            "fast": tolerant(day2.fast_monotonic_within_jump_num_sat),
+            "batched": tolerant(day2.batched_monotonic_within_jump_num_sat),
+            "dp": lambda levels: day2.tolerant_monotonic_within_jump_num_sat(
+                levels, max_removals=1
+            ),
+        },
+        prepare=day2.read_reports,
+    )
+
+
+def day3_scanners() -> Comparison:
+    import day3
+
+    return Comparison(
+        3,
+        # The state machine copies the rest of the input on every character
+        [2_000, 20_000],
+        {
+            "state machine": lambda code: day3.run_state_machine(
+                code, day3.MUL_STATES
+            ),
+            "regex": lambda code: day3.run_scanner(code, day3.MUL_STATES),
+        },
+        prepare=day3.read_code,
+    )
+
+
+def day3_do_dont() -> Comparison:
+    import day3
+    from utils import ProblemParts
+
+    scanner = day3.Scanner(day3.PART_INSTRUCTIONS[ProblemParts.Part2])
+
+    return Comparison(
+        3,
+        [100_000, 1_000_000],
+        {
+            "filter + regex": lambda code: day3.run_scanner(
+                day3.do_dont_filter(code), day3.MUL_STATES
+            ),
+            "instructions": lambda code: scanner.scan(code).count,
+        },
+        prepare=day3.read_code,
+    )
+
+
+def day4_search() -> Comparison:
+    import day4
+
+    return Comparison(
+        4,
+        [100, 300],
+        {
+            "per position": lambda word_array: day4.count_xmas_all(
+                word_array, day4.count_xmas_at_pos
+            ),
+            "shifted arrays": lambda word_array: day4.count_words(
+                day4.char_array(word_array), ["XMAS"]
+            ),
+        },
+        prepare=day4.read_word_array,
+    )
+
+
+def day4_x_mas() -> Comparison:
+    import day4
+
+    return Comparison(
+        4,
+        [100, 300],
+        {
+            "per position": lambda word_array: day4.count_xmas_all(
+                word_array, day4.count_x_mas_at_pos
+            ),
+            "stencil": lambda word_array: day4.count_stencil(
+                day4.char_array(word_array), day4.X_MAS, rotations=True
+            ),
+        },
+        prepare=day4.read_word_array,
+    )
+
+
+def day4_dictionary() -> Comparison:
+    import random
+
+    import day4
+
+    rng = random.Random(4)
+    words = [
+        "".join(rng.choice("XMAS") for _ in range(rng.randint(3, 8)))
+        for _ in range(1000)
+    ]
+
+    return Comparison(
+        4,
+        [100, 300],
+        {
+            "word at a time": lambda grid: day4.count_words(grid, words),
+            "aho-corasick": lambda grid: day4.count_dictionary(grid, words),
+        },
+        prepare=lambda path: day4.char_array(day4.read_word_array(path)),
+    )
+
+
+def day5_fix() -> Comparison:
+    import day5
+
+    return Comparison(
+        5,
+        [1_000, 10_000],
+        {
+            "pairwise + sort": lambda data: day5.fix_and_sum_mids(*data),
+            "topological": lambda data: day5.topo_fix_and_sum_mids(*data),
+            "batched": lambda data: day5.batched_fix_and_sum_mids(*data),
+        },
+        prepare=day5.read_problem,
+    )
+
+
+def day5_check() -> Comparison:
+    import day5
+
+    return Comparison(
+        5,
+        [10_000, 100_000],
+        {
+            "pairwise": lambda data: day5.sum_true_mids(*data),
+            "bitsets": lambda data: day5.topo_sum_true_mids(*data),
+            "batched": lambda data: day5.batched_sum_true_mids(*data),
+        },
+        prepare=day5.read_problem,
+    )
+
+
+def day6_parsed(path: Path) -> tuple[Any, Any]:
+    import day6
+
+    # Each engine gets its own structures, the old ones are mutated
+    return day6.read_maze(path), day6.read_lab(path)
+
+
+def day6_walk() -> Comparison:
+    import day6
+
+    return Comparison(
+        6,
+        [100, 300],
+        {
+            "step by step": lambda data: int(
+                day6.track_to_end_and_count(*data[0])
+            ),
+            "jump table": lambda data: data[1].visited().count(day6.VISITED),
+        },
+        prepare=day6_parsed,
+    )
+
+
+def day6_loops() -> Comparison:
+    import day6
+
+    return Comparison(
+        6,
+        [20, 40],
+        {
+            "step by step": lambda data: day6.count_potential_loops(*data[0]),
+            "jump table": lambda data: day6.count_potential_loops_jumps(
+                data[1]
+            ),
+            "incremental": lambda data: (
+                day6.count_potential_loops_incremental(data[1])
+            ),
+        },
+        prepare=day6_parsed,
+    )
+
+
+COMPARISONS: dict[str, Callable[[], Comparison]] = {
+    "day1-parse": day1_parsers,
+    "day2-safety": day2_safety,
+    "day3-scan": day3_scanners,
+    "day3-do-dont": day3_do_dont,
+    "day4-search": day4_search,
+    "day4-x-mas": day4_x_mas,
+    "day4-dictionary": day4_dictionary,
+    "day5-check": day5_check,
+    "day5-fix": day5_fix,
+    "day6-walk": day6_walk,
+    "day6-loops": day6_loops,
+}
+
+
+def best_time(
+    variant: Variant,
+    prepare: Callable[[Path], Any],
+    path: Path,
+    repeats: int,
+) -> tuple[float, Any]:
+    best, res = float("inf"), None
+    for _ in range(repeats):
+        # Prepared afresh each run, variants may sort or mutate their input
+        data = prepare(path)
+
+        start = time.perf_counter()
+        res = variant(data)
+        best = min(best, time.perf_counter() - start)
+
+    return best, res
+
+
+def run_comparison(
+    name: str, comparison: Comparison, sizes: list[int], repeats: int
+) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = write_input(comparison.day, size, Path(tmp_dir))
+
+            timings = dict()
+            results = dict()
+            for label, variant in comparison.variants.items():
+                timings[label], res = best_time(
+                    variant, comparison.prepare, path, repeats
+                )
+                results[label] = comparison.normalise(res)
+
+            reference = next(iter(results.values()))
+            agree = all(res == reference for res in results.values())
+
+            baseline = next(iter(timings.values()))
+            for label, t in timings.items():
+                print(
+                    f"{name:>16} {size:>10} {label:>20} {t:>10.4f} "
+                    f"{baseline / t:>8.1f}x"
+                )
+            if not agree:
+                print(f"{name:>16} {size:>10} RESULTS DISAGREE")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "comparisons", nargs="*", help=f"Any of {', '.join(COMPARISONS)}."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+")
+    parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+    names = args.comparisons if args.comparisons else list(COMPARISONS)
+
+    # Time the implementations, not the parsed-input cache
+    os.environ[PARSE_CACHE_ENABLE_ENV] = "0"
+
+    print(
+        f"{'comparison':>16} {'size':>10} {'variant':>20} {'time (s)':>10} "
+        f"{'speedup':>9}"
+    )
+    for name in names:
+        comparison = COMPARISONS[name]()
+        sizes = args.sizes if args.sizes else comparison.sizes
+        run_comparison(name, comparison, sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import csv
+import math
+import os
+import tempfile
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from gen_inputs import GENERATORS, write_input
+from runner import PART_LOOKUP, RunResult, run_part
+from utils import PARSE_CACHE_ENABLE_ENV, ProblemParts
+
+# Sweeps that keep the slowest solvers within a few seconds per point
+DEFAULT_SIZES: dict[int, list[int]] = {
+    1: [1_000, 10_000, 100_000],
+    2: [1_000, 10_000, 100_000],
+    3: [10_000, 100_000, 1_000_000],
+    4: [50, 100, 200],
+    5: [100, 1_000, 10_000],
+    6: [25, 50, 100],
+    7: [100, 200, 400],
+    8: [25, 50, 100],
+    9: [500, 1_000, 2_000],
+    10: [50, 100, 200],
+    11: [10, 100, 1_000],
+    12: [50, 100, 200],
+    13: [100, 1_000, 10_000],
+    14: [25, 50, 100],
+    15: [20, 40, 80],
+    16: [11, 21, 41],
+}
+
+
+@dataclass
+class ScalingPoint:
+    day: int
+    part: str
+    size: int
+    parse_time: float
+    solve_time: float
+    peak_rss_kib: int
+    exponent: float | None
+    error: str | None
+
+
+def scaling_exponent(
+    prev: ScalingPoint | None, size: int, total_time: float
+) -> float | None:
+    # Slope of log(time) against log(size) since the previous point
+    if prev is None or prev.error is not None:
+        return None
+
+    prev_time = prev.parse_time + prev.solve_time
+    if prev_time <= 0 or total_time <= 0 or size == prev.size:
+        return None
+
+    return math.log(total_time / prev_time) / math.log(size / prev.size)
+
+
+def best_run(
+    day: int, part: ProblemParts, data_dir: Path, repeats: int
+) -> RunResult:
+    best: RunResult | None = None
+    for _ in range(repeats):
+        res = run_part(day, part, data_dir)
+        if res.error is not None:
+            return res
+
+        if best is None or (
+            res.parse_time + res.solve_time < best.parse_time + best.solve_time
+        ):
+            best = res
+
+    assert best is not None
+    return best
+
+
+def sweep_day(
+    day: int,
+    sizes: list[int],
+    parts: list[ProblemParts],
+    seed: int,
+    repeats: int = 3,
+) -> list[ScalingPoint]:
+    points = []
+    prev_by_part: dict[ProblemParts, ScalingPoint] = dict()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir)
+        for i, size in enumerate(sizes):
+            write_input(day, size, data_dir, seed)
+
+            for part in parts:
+                if i == 0:
+                    # Untimed, so the first size does not pay for importing
+                    # the day and its lazy imports
+                    run_part(day, part, data_dir)
+
+                res = best_run(day, part, data_dir, max(1, repeats))
+                point = ScalingPoint(
+                    day,
+                    part.value,
+                    size,
+                    res.parse_time,
+                    res.solve_time,
+                    res.peak_rss_kib,
+                    scaling_exponent(
+                        prev_by_part.get(part),
+                        size,
+                        res.parse_time + res.solve_time,
+                    ),
+                    res.error,
+                )
+                prev_by_part[part] = point
+                points.append(point)
+
+    return points
+
+
+def print_points(points: list[ScalingPoint]) -> None:
+    print(
+        f"{'day':>4} {'part':>6} {'size':>10} {'parse (s)':>10} "
+        f"{'solve (s)':>10} {'peak rss (MiB)':>15} {'exponent':>9}"
+    )
+    for p in points:
+        exponent = f"{p.exponent:.2f}" if p.exponent is not None else "-"
+        print(
+            f"{p.day:>4} {p.part:>6} {p.size:>10} {p.parse_time:>10.4f} "
+            f"{p.solve_time:>10.4f} {p.peak_rss_kib / 1024:>15.1f} "
+            f"{exponent:>9}" + (f"  {p.error}" if p.error else "")
+        )
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Run each day over a size sweep of synthetic inputs."
+    )
+    parser.add_argument("--days", type=int, nargs="+")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Override the per day default sweep.",
+    )
+    parser.add_argument(
+        "--parts", type=int, nargs="+", choices=[1, 2], default=[1, 2]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Report the best of this many runs at each size.",
+    )
+    parser.add_argument("--csv-out", type=Path)
+
+    args = parser.parse_args()
+    days = args.days if args.days else sorted(GENERATORS)
+    parts = [PART_LOOKUP[p] for p in args.parts]
+
+    # Time the parsers, not the parsed-input cache
+    os.environ[PARSE_CACHE_ENABLE_ENV] = "0"
+
+    points = []
+    for day in days:
+        sizes = args.sizes if args.sizes else DEFAULT_SIZES[day]
+        points += sweep_day(day, sizes, parts, args.seed, args.repeats)
+
+    print_points(points)
+
+    if args.csv_out is not None:
+        with args.csv_out.open("w", newline="") as f:
+            writer = csv.DictWriter(
+                f, fieldnames=list(ScalingPoint.__dataclass_fields__)
+            )
+            writer.writeheader()
+            writer.writerows(asdict(p) for p in points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from runner import ROOT_PATH, discover_days
+
+
+@dataclass
+class StartupResult:
+    module: str
+    wall_ms: float
+    import_ms: float
+    heaviest: list[tuple[str, float]]
+
+
+ImportRow = tuple[int, str, float]  # Nesting level, name, cumulative ms
+
+
+def parse_importtime(stderr: str) -> list[ImportRow]:
+    # Rows look like: "import time: self [us] | cumulative | <indent>package"
+    rows = []
+    for row in stderr.splitlines():
+        if not row.startswith("import time:"):
+            continue
+
+        fields = row.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+
+        name_field = fields[2][1:]
+        level = (len(name_field) - len(name_field.lstrip())) // 2
+        rows.append((level, name_field.strip(), int(fields[1]) / 1000))
+
+    return rows
+
+
+def direct_imports(rows: list[ImportRow], module: str) -> list[ImportRow]:
+    # Children are listed before their parent, one level deeper
+    for i, (level, name, _) in enumerate(rows):
+        if name != module:
+            continue
+
+        children = []
+        for child in reversed(rows[:i]):
+            if child[0] <= level:
+                break
+            if child[0] == level + 1:
+                children.append(child)
+
+        return children
+
+    return []
+
+
+def time_import(module: str) -> tuple[float, list[ImportRow]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    return wall_ms, parse_importtime(proc.stderr)
+
+
+def bench_module(module: str, repeats: int, top: int) -> StartupResult:
+    best_wall = float("inf")
+    best_rows: list[ImportRow] = []
+    for _ in range(repeats):
+        wall_ms, rows = time_import(module)
+        if wall_ms < best_wall:
+            best_wall, best_rows = wall_ms, rows
+
+    import_ms = next((t for _, n, t in best_rows if n == module), 0.0)
+    heaviest = sorted(
+        ((name, t) for _, name, t in direct_imports(best_rows, module)),
+        key=lambda v: v[1],
+        reverse=True,
+    )
+
+    return StartupResult(module, best_wall, import_ms, heaviest[:top])
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Track `python -X importtime` cost per day module."
+    )
+    parser.add_argument("--days", type=int, nargs="+")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3)
+    parser.add_argument("--json-out", type=Path)
+
+    args = parser.parse_args()
+    days = args.days if args.days else discover_days()
+
+    # Smallest possible day module, for reference
+    results = [bench_module("utils", args.repeats, args.top)]
+    results += [
+        bench_module(f"day{day}", args.repeats, args.top) for day in days
+    ]
+
+    print(f"{'module':>8} {'wall (ms)':>10} {'import (ms)':>12}  heaviest")
+    for r in results:
+        heaviest = ", ".join(f"{name} {t:.1f}" for name, t in r.heaviest)
+        print(
+            f"{r.module:>8} {r.wall_ms:>10.1f} {r.import_ms:>12.1f}  {heaviest}"
+        )
+
+    if args.json_out is not None:
+        args.json_out.write_text(
+            json.dumps([asdict(r) for r in results], indent=2)
+        )
+
+
+if __name__ == "__main__":
+    main()
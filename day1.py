@@ -1,11 +1,29 @@
-from collections import Counter
+from __future__ import annotations
+
+import mmap
+from array import array
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day1.txt"
 
+CHUNK_BYTES = 1 << 24
+# Ints per column held in memory before a run is sorted and spilled to disk
+RUN_LEN = 1 << 24
+# Inputs larger than this are sorted externally instead of in memory
+EXTERNAL_SORT_BYTES = 1 << 30
+# Inputs larger than this are mapped rather than read by the bulk parser
+MMAP_BYTES = 1 << 26
+# Powers of ten that fit in an int64
+POW10 = [10**i for i in range(19)]
+
 
+@cached_parser(version=1)
 def read_to_list_pairs(path: Path) -> tuple[list[int], list[int]]:
     left_list = []
     right_list = []
@@ -20,22 +38,257 @@ def read_to_list_pairs(path: Path) -> tuple[list[int], list[int]]:
     return left_list, right_list
 
 
-def sorted_distance(list1: list[int], list2: list[int]) -> int:
+def iter_pair_chunks(
+    path: Path, chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[tuple[array, array]]:
+    # Reads whole rows at a time, carrying any partial row to the next chunk
+    with path.open("rb") as f:
+        tail = b""
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+
+            chunk = tail + chunk
+            cut = chunk.rfind(b"\n") + 1
+            chunk, tail = chunk[:cut], chunk[cut:]
+
+            values = array("q", map(int, chunk.split()))
+            yield values[0::2], values[1::2]
+
+        if tail.strip():
+            values = array("q", map(int, tail.split()))
+            yield values[0::2], values[1::2]
+
+
+@cached_parser(version=1)
+def read_to_arrays(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    import numpy as np
+
+    left_array, right_array = array("q"), array("q")
+    for left, right in iter_pair_chunks(path):
+        left_array.extend(left)
+        right_array.extend(right)
+
+    # Zero copy views over the int64 buffers
+    return (
+        np.frombuffer(left_array, dtype=np.int64),
+        np.frombuffer(right_array, dtype=np.int64),
+    )
+
+
+def parse_fixed_width_block(data: np.ndarray) -> np.ndarray | None:
+    """
+    Fast path for blocks where every row has its digits in the same columns,
+    as in the puzzle input. Returns None if the block is not laid out so.
+    """
+    import numpy as np
+
+    # Rows longer than this are not worth the fast path
+    newlines = np.flatnonzero(data[:4096] == ord("\n"))
+    if len(newlines) == 0:
+        return None
+
+    row_len = int(newlines[0]) + 1
+    if len(data) % row_len != 0:
+        return None
+
+    rows = data.reshape(-1, row_len)
+    is_digit = (rows >= ord("0")) & (rows <= ord("9"))
+    if (rows[:, -1] != ord("\n")).any() or (is_digit != is_digit[0]).any():
+        return None
+
+    # Column spans of each number, taken from the first row
+    edges = np.diff(is_digit[0].astype(np.int8), prepend=0, append=0)
+    spans = zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+
+    values = np.zeros((len(rows), int(edges.clip(0).sum())), dtype=np.int64)
+    for i, (col_start, col_end) in enumerate(spans):
+        for col in range(col_start, col_end):
+            values[:, i] *= 10
+            values[:, i] += rows[:, col] - ord("0")
+
+    return values.reshape(-1)
+
+
+def parse_int_block(block: bytes | memoryview) -> np.ndarray:
+    """
+    Every run of digits in `block` as an int64, in one vectorised pass.
+    """
+    import numpy as np
+
+    data = np.frombuffer(block, dtype=np.uint8)
+
+    fixed_width = parse_fixed_width_block(data)
+    if fixed_width is not None:
+        return fixed_width
+
+    is_digit = (data >= ord("0")) & (data <= ord("9"))
+
+    # +1 where a number starts, -1 one past where it ends
+    edges = np.diff(is_digit.astype(np.int8), prepend=0, append=0)
+    lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    if len(lengths) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    digits = (data[is_digit] - ord("0")).astype(np.int64)
+
+    # Place value of each digit is its distance from the end of its number
+    number_ends = np.cumsum(lengths)
+    powers = np.repeat(number_ends, lengths) - 1 - np.arange(len(digits))
+    digits *= np.array(POW10, dtype=np.int64)[powers]
+
+    return np.add.reduceat(digits, number_ends - lengths)
+
+
+@cached_parser(version=1)
+def bulk_read_to_arrays(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    import numpy as np
+
+    with path.open("rb") as f:
+        size = path.stat().st_size
+        if size == 0:
+            buffer = b""
+        elif size > MMAP_BYTES:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+        # Chunks end on a newline, which bounds the temporary arrays
+        blocks = []
+        view = memoryview(buffer)
+        start = 0
+        while start < size:
+            end = min(start + CHUNK_BYTES, size)
+            if end < size:
+                # Extend to the end of the row the chunk stopped in
+                end = buffer.find(b"\n", end - 1) + 1 or size
+
+            blocks.append(parse_int_block(view[start:end]))
+            start = end
+
+        view.release()
+
+    values = np.concatenate(blocks) if blocks else np.zeros(0, np.int64)
+    return values[0::2].copy(), values[1::2].copy()
+
+
+def sorted_distance(list1: np.ndarray, list2: np.ndarray) -> int:
+    import numpy as np
+
+    list1, list2 = np.asarray(list1), np.asarray(list2)
     list1.sort()
     list2.sort()
-    return sum(abs(left - right) for left, right in zip(list1, list2))
+    return int(np.abs(list1 - list2).sum())
 
 
-def similarity_score(list1: list[int], list2: list[int]) -> int:
-    weight = Counter(list2)
-    return sum(v * weight[v] for v in list1)
+def similarity_score(list1: np.ndarray, list2: np.ndarray) -> int:
+    import numpy as np
 
+    list1 = np.asarray(list1)
+    values, counts = np.unique(list2, return_counts=True)
+    if len(values) == 0:
+        return 0
 
-def main():
-    part = simple_parser_to_part()
+    idx = np.searchsorted(values, list1)
+    idx[idx == len(values)] = 0
+    found = values[idx] == list1
 
-    data_path = Path(DATA_PATH_STR)
-    left_list, right_list = read_to_list_pairs(data_path)
+    return int((list1[found] * counts[idx[found]]).sum())
+
+
+def write_sorted_runs(
+    path: Path, tmp_dir: Path, run_len: int = RUN_LEN
+) -> tuple[list[Path], list[Path]]:
+    import numpy as np
+
+    runs: tuple[list[Path], list[Path]] = ([], [])
+    buffers = (array("q"), array("q"))
+
+    def spill() -> None:
+        for col, buffer in enumerate(buffers):
+            run_path = tmp_dir / f"run{col}_{len(runs[col])}.bin"
+            np.sort(np.frombuffer(buffer, dtype=np.int64)).tofile(run_path)
+            runs[col].append(run_path)
+            del buffer[:]
+
+    for left, right in iter_pair_chunks(path):
+        buffers[0].extend(left)
+        buffers[1].extend(right)
+
+        if len(buffers[0]) >= run_len:
+            spill()
+
+    if len(buffers[0]) > 0:
+        spill()
+
+    return runs
+
+
+def iter_run(path: Path, block_len: int = 1 << 16) -> Iterator[int]:
+    with path.open("rb") as f:
+        while block := f.read(block_len * 8):
+            yield from array("q", block)
+
+
+def merged_runs(run_paths: list[Path]) -> Iterator[int]:
+    import heapq
+
+    return heapq.merge(*(iter_run(p) for p in run_paths))
+
+
+def sorted_similarity_score(
+    sorted1: Iterable[int], sorted2: Iterable[int]
+) -> int:
+    # Merge join, the count of each value in sorted2 is found once
+    score = 0
+    right_iter = iter(sorted2)
+    right = next(right_iter, None)
+
+    prev_v, weight = None, 0
+    for v in sorted1:
+        if v != prev_v:
+            weight = 0
+            while right is not None and right < v:
+                right = next(right_iter, None)
+            while right is not None and right == v:
+                weight += 1
+                right = next(right_iter, None)
+            prev_v = v
+
+        score += v * weight
+
+    return score
+
+
+def solve_external(
+    path: Path, part: ProblemParts, run_len: int = RUN_LEN
+) -> int:
+    """
+    Constant memory path for inputs larger than RAM: each column is sorted in
+    runs of `run_len` spilled to disk, then the runs are merged lazily.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        left_runs, right_runs = write_sorted_runs(path, Path(tmp_dir), run_len)
+        left, right = merged_runs(left_runs), merged_runs(right_runs)
+
+        match part:
+            case ProblemParts.Part1:
+                dist = sum(abs(v1 - v2) for v1, v2 in zip(left, right))
+            case ProblemParts.Part2:
+                dist = sorted_similarity_score(left, right)
+
+    return dist
+
+
+def parse_input(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    return bulk_read_to_arrays(path)
+
+
+def solve(data: tuple[np.ndarray, np.ndarray], part: ProblemParts) -> int:
+    left_list, right_list = data
 
     match part:
         case ProblemParts.Part1:
@@ -43,6 +296,19 @@ def main():
         case ProblemParts.Part2:
             dist = similarity_score(left_list, right_list)
 
+    return dist
+
+
+def main():
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    if data_path.stat().st_size > EXTERNAL_SORT_BYTES:
+        dist = solve_external(data_path, part)
+    else:
+        data = parse_input(data_path)
+        dist = solve(data, part)
+
     print(dist)
 
 
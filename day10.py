@@ -1,81 +1,58 @@
+from array import array
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from grid import Grid
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day10.txt"
 
-DIRS = [1j, -1j, 1, -1]
+# Never one more than a height, so the border is never a next step
+PAD = 0xFF
+NOT_TRAIL = 0xFE
 
 
 @dataclass
 class Trail:
-    start: list[complex]
-    trail_next: dict[complex, list[complex]]
-    trail_val: dict[complex, int]
+    start: list[int]
+    heights: Grid
 
-    def next_pos(self, pos: complex) -> list[complex]:
-        return self.trail_next[pos]
+    def next_pos(self, pos: int) -> list[int]:
+        next_val = self.heights[pos] + 1
+        return [
+            pos + d
+            for d in self.heights.offsets
+            if self.heights[pos + d] == next_val
+        ]
 
-    def get_val(self, pos: complex) -> int:
-        return self.trail_val[pos]
-
-
-def in_trail_list(pos: complex, trail_list: list[list[int]]) -> bool:
-    if int(pos.real) < 0:
-        return False
-    elif int(pos.real) >= len(trail_list):
-        return False
-    elif int(pos.imag) < 0:
-        return False
-    elif int(pos.imag) >= len(trail_list[0]):
-        return False
-
-    return True
+    def get_val(self, pos: int) -> int:
+        return self.heights[pos]
 
 
+@cached_parser(version=2)
 def parse_trail(path: Path) -> Trail:
-    trail_list = list()
-    with path.open() as f:
-        for row in f:
-            trail_row = []
-            for v in row.strip():
-                if not v.isnumeric():
-                    trail_row.append(-2)
-                else:
-                    trail_row.append(int(v))
-
-            trail_list.append(trail_row)
-
-    trail_next_dict = defaultdict(list)
-    trail_val_dict = dict()
-    start_list = []
-    for r, row in enumerate(trail_list):
-        for c, v in enumerate(row):
-            pos = complex(r, c)
-
-            trail_val_dict[pos] = v
+    heights = Grid.from_file(path, pad_value=PAD)
 
-            if v == 0:
-                start_list.append(pos)
+    start_list = []
+    for idx in heights.indices():
+        v = heights[idx]
+        if ord("0") <= v <= ord("9"):
+            heights[idx] = v - ord("0")
+        else:
+            heights[idx] = NOT_TRAIL
 
-            for d in DIRS:
-                n_pos = pos + d
-                if (
-                    in_trail_list(n_pos, trail_list)
-                    and trail_list[int(n_pos.real)][int(n_pos.imag)] == v + 1
-                ):
-                    trail_next_dict[pos].append(n_pos)
+        if heights[idx] == 0:
+            start_list.append(idx)
 
-    return Trail(start_list, trail_next_dict, trail_val_dict)
+    return Trail(start_list, heights)
 
 
 def count_trail_heads(trail: Trail) -> int:
     mem = defaultdict(set)
     count = 0
 
-    def work(pos: complex) -> set[complex]:
+    def work(pos: int) -> set[int]:
         if pos in mem:
             return mem[pos]
 
@@ -99,11 +76,12 @@ def count_trail_heads(trail: Trail) -> int:
 
 
 def count_trail_combinations(trail: Trail) -> int:
-    mem = defaultdict(int)
+    # Flat memo over cell indices, -1 for not yet visited
+    mem = array("q", [-1]) * len(trail.heights.cells)
     count = 0
 
-    def work(pos: complex) -> int:
-        if pos in mem:
+    def work(pos: int) -> int:
+        if mem[pos] >= 0:
             return mem[pos]
 
         if trail.get_val(pos) == 9:
@@ -125,12 +103,11 @@ def count_trail_combinations(trail: Trail) -> int:
     return count
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> Trail:
+    return parse_trail(path)
 
-    data_path = Path(DATA_PATH_STR)
-    trail = parse_trail(data_path)
 
+def solve(trail: Trail, part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             count = count_trail_heads(trail)
@@ -138,6 +115,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = count_trail_combinations(trail)
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    trail = parse_input(data_path)
+
+    count = solve(trail, part)
     print("count:", count)
 
 
@@ -2,11 +2,12 @@ from collections import defaultdict
 from functools import lru_cache
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day11.txt"
 
 
+@cached_parser(version=1)
 def parse_to_stone_dict(path: Path) -> dict[int, int]:
     res = dict()
     with path.open() as f:
@@ -46,12 +47,11 @@ def n_update_stone_dict(stone_dict: dict[int, int], n: int) -> dict[int, int]:
     return stone_dict
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> dict[int, int]:
+    return parse_to_stone_dict(path)
 
-    data_path = Path(DATA_PATH_STR)
-    stone_dict = parse_to_stone_dict(data_path)
 
+def solve(stone_dict: dict[int, int], part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             count = sum(v for v in n_update_stone_dict(stone_dict, 25).values())
@@ -59,6 +59,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = sum(v for v in n_update_stone_dict(stone_dict, 75).values())
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    stone_dict = parse_input(data_path)
+
+    count = solve(stone_dict, part)
     print("count:", count)
 
 
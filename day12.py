@@ -1,140 +1,123 @@
-from collections import defaultdict
+from array import array
+from functools import cached_property
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from grid import Grid
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day12.txt"
 
-DIRS = [1, 1j, -1, -1j]
-R1_DIRS = [1j, -1, -1j, 1]
-
-CROSS_DIRS = [1 + 1j, -1 + 1j, -1 - 1j, -1j + 1]
-
-
-def get_possible_neighbours(
-    pos: complex, valid_set: set[complex]
-) -> list[complex]:
-    res = []
-    for d in DIRS:
-        if pos + d in valid_set:
-            res.append(pos + d)
-    return res
+# Never a plant, so the border always counts as a fence
+PAD = 0
 
 
 class Garden:
-    def __init__(self, plants: dict[str, list[complex]]) -> None:
-        self.plants = self.separate_plants(plants)
-
-    def separate_plants(
-        self, plants: dict[str, list[complex]]
-    ) -> dict[str, list[complex]]:
-        new_plants = defaultdict(list)
-        for c, pos_list in plants.items():
-            pos_set = set(pos_list)
-            counter = 0
-            while len(pos_set) > 0:
-                label = f"{c}_{counter}"
-                start_elem = pos_set.pop()
-                search_list = [start_elem]
-
-                while len(search_list) > 0:
-                    cur_node = search_list.pop()
-                    new_plants[label].append(cur_node)
-
-                    next_nodes = get_possible_neighbours(cur_node, pos_set)
-
-                    for n_node in next_nodes:
+    """
+    The garden grid with the region of every cell in a flat array alongside
+    it, and per region totals, so no region keeps a list of its cells.
+    Fences and corners are only counted when a part asks for them.
+    """
+
+    def __init__(self, grid: Grid) -> None:
+        self.grid = grid
+        self.region, self.area = self.separate_plants(grid)
+
+    @staticmethod
+    def separate_plants(grid: Grid) -> tuple[array, array]:
+        # Region id per cell, -1 for the padding, and the area of each region
+        region = array("i", [-1]) * len(grid.cells)
+        area = array("I")
+
+        for start_elem in grid.indices():
+            if region[start_elem] >= 0:
+                continue
+
+            v = grid[start_elem]
+            label = len(area)
+            region[start_elem] = label
+            search_list = array("i", [start_elem])
+            n_cells = 0
+
+            while len(search_list) > 0:
+                cur_node = search_list.pop()
+                n_cells += 1
+
+                for d in grid.offsets:
+                    n_node = cur_node + d
+                    if grid[n_node] == v and region[n_node] < 0:
+                        region[n_node] = label
                         search_list.append(n_node)
-                        pos_set.remove(n_node)
 
-                counter += 1
+            area.append(n_cells)
 
-        return new_plants
+        return region, area
 
+    @cached_property
+    def perimeter(self) -> array:
+        cells, region, offsets = self.grid.cells, self.region, self.grid.offsets
 
-def parse_garden(path: Path) -> Garden:
-    plants = defaultdict(list)
-    with path.open() as f:
-        for r, row in enumerate(f):
-            row = row.strip()
-            for c, v in enumerate(row):
-                pos = complex(r, c)
-                plants[v].append(pos)
+        perimeter = array("I", [0]) * len(self.area)
+        for idx in self.grid.indices():
+            v = cells[idx]
+            fences = sum(cells[idx + d] != v for d in offsets)
+            if fences:
+                perimeter[region[idx]] += fences
+
+        return perimeter
+
+    @cached_property
+    def corners(self) -> array:
+        grid, region = self.grid, self.region
 
-    return Garden(plants)
+        corners = array("I", [0]) * len(self.area)
+        for idx in grid.indices():
+            corners[region[idx]] += corners_at_pos(idx, grid)
 
+        return corners
 
-def gen_perimeter_dict(garden: Garden) -> dict[str, int]:
-    perimeter_dict = defaultdict(int)
-    for c, pos_list in garden.plants.items():
-        seen = set()
-        for pos in pos_list:
-            for d in DIRS:
-                npos = pos + d
-                if npos in seen:
-                    perimeter_dict[c] -= 1
-                else:
-                    perimeter_dict[c] += 1
 
-                seen.add(pos)
+@cached_parser(version=3)
+def parse_garden(path: Path) -> Garden:
+    return Garden(Grid.from_file(path, pad_value=PAD))
 
-    return perimeter_dict
 
+def corners_at_pos(pos: int, grid: Grid) -> int:
+    # Same plant at a neighbour means same region, as they are connected
+    v = grid[pos]
+    offsets = grid.offsets
 
-def corners_at_pos(pos: complex, pos_set: set[complex]) -> int:
-    cond_count = sum(d + pos not in pos_set for d in DIRS)
+    cond_count = sum(grid[pos + d] != v for d in offsets)
     if cond_count == 4:
         return 4
     elif cond_count == 3:
         return 2
 
     corners = 0
-    for d1, d2 in zip(DIRS, R1_DIRS):
-        if pos + d1 in pos_set and pos + d2 in pos_set:
-            if (pos + d1 + d2) not in pos_set:
+    for d1, d2 in zip(offsets, offsets[1:] + offsets[:1]):
+        if grid[pos + d1] == v and grid[pos + d2] == v:
+            if grid[pos + d1 + d2] != v:
                 # inner
                 corners += 1
-            if ((pos - d1) not in pos_set) and ((pos - d2) not in pos_set):
+            if grid[pos - d1] != v and grid[pos - d2] != v:
                 # outer
                 corners += 1
     return corners
 
 
-def gen_side_dict(garden: Garden) -> dict[str, int]:
-    side_dict = defaultdict(int)
-    for c, pos_list in garden.plants.items():
-        pos_set = set(pos_list)
-
-        for pos in pos_list:
-            side_dict[c] += corners_at_pos(pos, pos_set)
-
-    return side_dict
-
-
 def calculate_perimeter_cost(garden: Garden):
-    cost = 0
-    perimeter_dict = gen_perimeter_dict(garden)
-    for c, pos_list in garden.plants.items():
-        cost += perimeter_dict[c] * len(pos_list)
-
-    return cost
+    return sum(a * p for a, p in zip(garden.area, garden.perimeter))
 
 
 def calculate_side_cost(garden: Garden):
-    cost = 0
-    side_dict = gen_side_dict(garden)
-    for c, pos_list in garden.plants.items():
-        cost += side_dict[c] * len(pos_list)
+    # A polygon has as many sides as corners
+    return sum(a * c for a, c in zip(garden.area, garden.corners))
 
-    return cost
 
+def parse_input(path: Path) -> Garden:
+    return parse_garden(path)
 
-def main() -> None:
-    part = simple_parser_to_part()
-
-    data_path = Path(DATA_PATH_STR)
-    garden = parse_garden(data_path)
 
+def solve(garden: Garden, part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             count = calculate_perimeter_cost(garden)
@@ -142,6 +125,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = calculate_side_cost(garden)
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    garden = parse_input(data_path)
+
+    count = solve(garden, part)
     print("count:", count)
 
 
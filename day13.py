@@ -1,9 +1,13 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import numpy as np
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day13.txt"
 
@@ -14,7 +18,10 @@ class Problem:
     target: np.ndarray
 
 
+@cached_parser(version=1)
 def parse_equations(path: Path) -> list[Problem]:
+    import numpy as np
+
     problems = list()
     counter = 0
     array_list = []
@@ -54,6 +61,8 @@ def parse_equations(path: Path) -> list[Problem]:
 
 
 def count_tokens(problems: list[Problem]) -> int:
+    import numpy as np
+
     tokens = 0
     for problem in problems:
         res = np.linalg.inv(problem.matrix) @ problem.target
@@ -72,12 +81,11 @@ def add_extra(problems: list[Problem]) -> list[Problem]:
     return problems
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> list[Problem]:
+    return parse_equations(path)
 
-    data_path = Path(DATA_PATH_STR)
-    problems = parse_equations(data_path)
 
+def solve(problems: list[Problem], part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             count = count_tokens(problems)
@@ -85,6 +93,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = count_tokens(add_extra(problems))
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    problems = parse_input(data_path)
+
+    count = solve(problems, part)
     print("count:", count)
 
 
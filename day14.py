@@ -1,14 +1,15 @@
+from __future__ import annotations
+
 import math
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Counter
+from typing import TYPE_CHECKING, Counter
 
-import matplotlib.pyplot as plt
-import numpy as np
-from sklearn.svm import OneClassSVM
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day14.txt"
 RE_PATTERN = re.compile(r"=(-?\d+),(-?\d+)")
@@ -35,6 +36,7 @@ class Robot:
         self.pos = new_pos
 
 
+@cached_parser(version=1)
 def parse_robots(path: Path) -> list[Robot]:
     robots = list()
     with path.open() as f:
@@ -94,6 +96,8 @@ def print_count_array(robots: list[Robot]) -> None:
 
 
 def to_binary_array(robots: list[Robot]) -> np.ndarray:
+    import numpy as np
+
     data = np.zeros((WORLD_DIM[1], WORLD_DIM[0]))
     for r in robots:
         data[int(r.pos.imag), int(r.pos.real)] = 1
@@ -102,6 +106,8 @@ def to_binary_array(robots: list[Robot]) -> np.ndarray:
 
 
 def to_prob_array(robots: list[Robot]) -> np.ndarray:
+    import numpy as np
+
     data = np.zeros((WORLD_DIM[1], WORLD_DIM[0]))
     for r in robots:
         data[int(r.pos.imag), int(r.pos.real)] = 1
@@ -113,6 +119,8 @@ def to_prob_array(robots: list[Robot]) -> np.ndarray:
 def to_chunked_prob_array(
     robots: list[Robot], chunk_size: int = 10
 ) -> np.ndarray:
+    import numpy as np
+
     data = np.zeros(
         (
             math.ceil(WORLD_DIM[1] / chunk_size),
@@ -138,12 +146,16 @@ def print_nonzero_array(array: np.ndarray) -> None:
 
 
 def calculate_entropy(prob_array: np.ndarray) -> float:
+    import numpy as np
+
     prob_vec = prob_array.flatten()
 
     return -(prob_vec * np.log(prob_vec, where=prob_vec > 0)).sum()
 
 
 def min_entropy(robots: list[Robot], n_steps: int = 10_000) -> int:
+    import numpy as np
+
     for r in robots:
         r.reset()
 
@@ -165,6 +177,8 @@ def min_entropy(robots: list[Robot], n_steps: int = 10_000) -> int:
 
 
 def plot_entropy(robots: list[Robot], n_steps: int = 10_000) -> None:
+    import matplotlib.pyplot as plt
+
     for r in robots:
         r.reset()
 
@@ -182,6 +196,8 @@ def plot_entropy(robots: list[Robot], n_steps: int = 10_000) -> None:
 
 
 def gen_data(robots: list[Robot], n_samples: int = 10_000) -> np.ndarray:
+    import numpy as np
+
     datas = list()
     for _ in range(n_samples):
         for r in robots:
@@ -196,6 +212,9 @@ def gen_data(robots: list[Robot], n_samples: int = 10_000) -> np.ndarray:
 
 
 def lol(robots: list[Robot], n_training_sim: int = 100_000) -> None:
+    import matplotlib.pyplot as plt
+    from sklearn.svm import OneClassSVM
+
     print("Generating Data")
     data = gen_data(robots, n_samples=n_training_sim)
     model = OneClassSVM()
@@ -218,12 +237,11 @@ def lol(robots: list[Robot], n_training_sim: int = 100_000) -> None:
     plt.show()
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> list[Robot]:
+    return parse_robots(path)
 
-    data_path = Path(DATA_PATH_STR)
-    robots = parse_robots(data_path)
 
+def solve(robots: list[Robot], part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             simulate_n_rounds(robots, 100)
@@ -234,6 +252,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = min_entropy(robots, 8_000)
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    robots = parse_input(data_path)
+
+    count = solve(robots, part)
     print("count:", count)
 
 
@@ -1,26 +1,32 @@
 from abc import ABC, abstractmethod
-from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Iterable
 
-from utils import ProblemParts, simple_parser_to_part
+from grid import EAST, NORTH, SOUTH, WEST, Grid
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day15.txt"
 
 MoveStr = str
-LEFT = 0 - 1j
-RIGHT = 0 + 1j
-UP = -1 + 0j
-DOWN = +1 + 0j
+MOVES = {"^": NORTH, "<": WEST, ">": EAST, "v": SOUTH}
+
+WALL = ord("#")
+EMPTY = ord(".")
+OBJECT = ord("O")
+OBJECT_LEFT = ord("[")
+OBJECT_RIGHT = ord("]")
+SUB = ord("@")
 
 
 class AbstractMaze(ABC):
+    grid: Grid
+
     @abstractmethod
-    def move(self, dir: complex) -> None:
+    def move(self, dir: int) -> None:
         pass
 
     @abstractmethod
-    def object_loc_list(self) -> Iterable[complex]:
+    def object_loc_list(self) -> Iterable[int]:
         pass
 
     def print(self) -> None:
@@ -28,158 +34,116 @@ class AbstractMaze(ABC):
 
 
 class Maze(AbstractMaze):
-    def __init__(
-        self,
-        sub_loc: complex,
-        object_set: set[complex],
-        wall_set: set[complex],
-    ) -> None:
+    def __init__(self, sub_loc: int, grid: Grid) -> None:
         self.sub_loc = sub_loc
-        self.object_set = object_set
-        self.wall_set = wall_set
+        self.grid = grid
 
-    def object_loc_list(self) -> Iterable[complex]:
-        return self.object_set
+    def object_loc_list(self) -> Iterable[int]:
+        return (idx for idx in self.grid.indices() if self.grid[idx] == OBJECT)
 
-    def move(self, dir: complex) -> None:
-        next_loc = self.sub_loc + dir
+    def move(self, dir: int) -> None:
+        offset = self.grid.offsets[dir]
+        next_loc = self.sub_loc + offset
 
         # Check for wall
-        if next_loc in self.wall_set:
+        if self.grid[next_loc] == WALL:
             return
         # Nothing, then move
-        if next_loc not in self.object_set:
+        if self.grid[next_loc] != OBJECT:
             self.sub_loc = next_loc
             return
 
         # Now need to do the shoving case
         check_loc = next_loc
-        while check_loc in self.object_set:
-            check_loc += dir
+        while self.grid[check_loc] == OBJECT:
+            check_loc += offset
 
         # Can't shove as wall
-        if check_loc in self.wall_set:
+        if self.grid[check_loc] == WALL:
             return
         else:
-            self.object_set.remove(next_loc)
-            self.object_set.add(check_loc)
+            self.grid[next_loc] = EMPTY
+            self.grid[check_loc] = OBJECT
             self.sub_loc = next_loc
 
         return
 
 
 class LargeMaze(AbstractMaze):
-    def __init__(
-        self,
-        sub_loc: complex,
-        object_dict: dict[complex, int],
-        wall_set: set[complex],
-    ) -> None:
+    def __init__(self, sub_loc: int, grid: Grid) -> None:
         self.sub_loc = sub_loc
-        self.object_dict = object_dict
-        self.wall_set = wall_set
+        self.grid = grid
 
-        id_to_pos = defaultdict(list)
-        for pos, id in object_dict.items():
-            id_to_pos[id].append(pos)
-        self.id_to_pos = {id: tuple(poses) for id, poses in id_to_pos.items()}
+    def object_loc_list(self) -> Iterable[int]:
+        return (
+            idx for idx in self.grid.indices() if self.grid[idx] == OBJECT_LEFT
+        )
 
-    def object_loc_list(self) -> Iterable[complex]:
-        return [p[0] for p in self.id_to_pos.values()]
+    def object_left(self, loc: int) -> int:
+        return loc - 1 if self.grid[loc] == OBJECT_RIGHT else loc
 
-    def move(self, dir: complex) -> None:
-        next_loc = self.sub_loc + dir
+    def move(self, dir: int) -> None:
+        offset = self.grid.offsets[dir]
+        next_loc = self.sub_loc + offset
 
         # Check for wall
-        if next_loc in self.wall_set:
+        if self.grid[next_loc] == WALL:
             return
         # Nothing, then move
-        if next_loc not in self.object_dict:
+        if self.grid[next_loc] == EMPTY:
             self.sub_loc = next_loc
             return
 
-        # Now need to do the shoving case
-        shove_stack = [next_loc]
-        move_set = Counter()
+        # Now need to do the shoving case, find every object in the way
+        shove_stack = [self.object_left(next_loc)]
+        move_set = set(shove_stack)
         move_list = list()
 
         # Check if move is valid
         while shove_stack:
-            check_loc = shove_stack.pop()
-
-            if check_loc in self.object_dict:
-                check_id = self.object_dict[check_loc]
-                p1, p2 = self.id_to_pos[check_id]
-
-                # Already seen, can skip checks and stuff
-                if move_set[check_id] == 2:
-                    continue
-
-                move_set[check_id] += 1
-                move_list.append(check_id)
-                shove_stack.append(p1 + dir)
-                shove_stack.append(p2 + dir)
-
-            # Can't shove as wall
-            elif check_loc in self.wall_set:
-                return
+            left = shove_stack.pop()
+            move_list.append(left)
 
-        # Move everything
-        new_obj_pos = dict()
-        del_set = set()
+            for check_loc in (left + offset, left + 1 + offset):
+                v = self.grid[check_loc]
 
-        for obj_id in list(set(move_list)):
-            p1, p2 = self.id_to_pos[obj_id]
+                # Can't shove as wall
+                if v == WALL:
+                    return
+                elif v == OBJECT_LEFT or v == OBJECT_RIGHT:
+                    check_left = self.object_left(check_loc)
+                    if check_left not in move_set:
+                        move_set.add(check_left)
+                        shove_stack.append(check_left)
 
-            del_set.add(p1)
-            del_set.add(p2)
+        # Move everything, clear first so objects can overlap old spots
+        for left in move_list:
+            self.grid[left] = self.grid[left + 1] = EMPTY
 
-            new_p1 = p1 + dir
-            new_p2 = p2 + dir
-
-            self.id_to_pos[obj_id] = (new_p1, new_p2)
-
-            new_obj_pos[new_p1] = obj_id
-            new_obj_pos[new_p2] = obj_id
-
-        for pos in del_set:
-            del self.object_dict[pos]
-
-        self.object_dict = self.object_dict | new_obj_pos
+        for left in move_list:
+            self.grid[left + offset] = OBJECT_LEFT
+            self.grid[left + 1 + offset] = OBJECT_RIGHT
 
         self.sub_loc = next_loc
 
         return
 
     def print(self) -> None:
-        SIZE = 50
+        self.grid[self.sub_loc] = SUB
         print()
-        for r in range(SIZE):
-            for c in range(SIZE * 2):
-                pos = complex(r, c)
-
-                if pos == self.sub_loc:
-                    print("@", end="")
-                elif pos in self.wall_set:
-                    print("#", end="")
-                elif pos in self.object_dict:
-                    print("o", end="")
-                else:
-                    print(".", end="")
-
-            print()
+        self.grid.print()
+        self.grid[self.sub_loc] = EMPTY
 
 
+@cached_parser(version=2)
 def parse_sub_map(path: Path) -> tuple[MoveStr, Maze]:
-    start_pos = 0
-    wall_set = set()
-    object_set = set()
+    maze_rows = list()
     move_str_list = list()
 
     maze_flag = True
 
     with path.open() as f:
-        for r, row in enumerate(f):
+        for row in f:
             row = row.strip()
 
             # Next part of input
@@ -188,35 +152,24 @@ def parse_sub_map(path: Path) -> tuple[MoveStr, Maze]:
                 continue
 
             if maze_flag:
-                for c, v in enumerate(row):
-                    pos = complex(r, c)
-
-                    match v:
-                        case "#":
-                            wall_set.add(pos)
-                        case "O":
-                            object_set.add(pos)
-                        case "@":
-                            start_pos = pos
+                maze_rows.append(row)
             else:
                 move_str_list.append(row)
 
-    maze = Maze(start_pos, object_set, wall_set)
+    # The sub is tracked by position, not kept in the grid
+    grid = Grid.from_rows(maze_rows, pad_value=WALL)
+    start_pos = grid.find(SUB)
+    grid[start_pos] = EMPTY
+
+    maze = Maze(start_pos, grid)
     return "".join(move_str_list), maze
 
 
 def execute_move_str(maze: AbstractMaze, move_str: str) -> None:
     for m in move_str:
         # print(m)
-        match m:
-            case "^":
-                maze.move(UP)
-            case "<":
-                maze.move(LEFT)
-            case ">":
-                maze.move(RIGHT)
-            case "v":
-                maze.move(DOWN)
+        if m in MOVES:
+            maze.move(MOVES[m])
 
         # maze.print()
 
@@ -224,31 +177,36 @@ def execute_move_str(maze: AbstractMaze, move_str: str) -> None:
 def pos_score(maze: AbstractMaze) -> int:
     score = 0
     for o in maze.object_loc_list():
-        score += o.real * 100 + o.imag
+        r, c = maze.grid.position(o)
+        score += r * 100 + c
 
     return int(score)
 
 
 def to_large_maze(maze: Maze) -> LargeMaze:
-    sub_loc = complex(maze.sub_loc.real, 2 * maze.sub_loc.imag)
-    object_dict = dict()
-    for i, obj_pos in enumerate(maze.object_set):
-        object_dict[complex(obj_pos.real, 2 * obj_pos.imag)] = i
-        object_dict[complex(obj_pos.real, 2 * obj_pos.imag + 1)] = i
+    grid = maze.grid
+    large_grid = Grid(grid.n_rows, 2 * grid.n_cols, EMPTY, pad_value=WALL)
 
-    wall_set = set()
-    for i, obj_pos in enumerate(maze.wall_set):
-        wall_set.add(complex(obj_pos.real, 2 * obj_pos.imag))
-        wall_set.add(complex(obj_pos.real, 2 * obj_pos.imag + 1))
+    for idx in grid.indices():
+        r, c = grid.position(idx)
+        large_idx = large_grid.index(r, 2 * c)
 
-    return LargeMaze(sub_loc, object_dict, wall_set)
+        if grid[idx] == WALL:
+            large_grid[large_idx] = large_grid[large_idx + 1] = WALL
+        elif grid[idx] == OBJECT:
+            large_grid[large_idx] = OBJECT_LEFT
+            large_grid[large_idx + 1] = OBJECT_RIGHT
 
+    r, c = grid.position(maze.sub_loc)
+    return LargeMaze(large_grid.index(r, 2 * c), large_grid)
 
-def main() -> None:
-    part = simple_parser_to_part()
 
-    data_path = Path(DATA_PATH_STR)
-    move_str, maze = parse_sub_map(data_path)
+def parse_input(path: Path) -> tuple[MoveStr, Maze]:
+    return parse_sub_map(path)
+
+
+def solve(data: tuple[MoveStr, Maze], part: ProblemParts) -> int:
+    move_str, maze = data
 
     match part:
         case ProblemParts.Part1:
@@ -260,6 +218,16 @@ def main() -> None:
             execute_move_str(maze, move_str)
             count = pos_score(maze)
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    data = parse_input(data_path)
+
+    count = solve(data, part)
     print("count:", count)
 
 
@@ -1,60 +1,55 @@
 from __future__ import annotations
 
 import heapq
+import math
 from collections import defaultdict
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from grid import EAST, NORTH, SOUTH, WEST, Grid
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day16.txt"
 
-State = tuple[complex, int]  # Position, Rotation
-DIRS = [1j, 1, -1j, -1]
+State = tuple[int, int]  # Position, Rotation
+ROTATIONS = [EAST, SOUTH, WEST, NORTH]
+
+WALL = ord("#")
 
 
 class Maze:
-    def __init__(self, target: complex, wall_set: set[complex]) -> None:
+    def __init__(self, target: int, grid: Grid) -> None:
         self.target = target
-        self.wall_set = wall_set
+        self.grid = grid
+        self.dirs = [grid.offsets[d] for d in ROTATIONS]
 
     def moves(self, state: State) -> list[tuple[State, float]]:
         pos, r_int = state
-        dir = DIRS[r_int]
+        dir = self.dirs[r_int]
 
         next_states = list()
         next_states.append(((pos, (r_int + 1) % 4), 1000.0))
         next_states.append(((pos, (r_int - 1) % 4), 1000.0))
-        if pos + dir not in self.wall_set:
+        if self.grid[pos + dir] != WALL:
             next_states.append(((pos + dir, r_int), 1))
 
         return next_states
 
     def score_to_target(self, state: State) -> float:
-        return 100 * abs(self.target - state[0])
+        r, c = self.grid.position(state[0])
+        target_r, target_c = self.grid.position(self.target)
+        return 100 * math.hypot(target_r - r, target_c - c)
 
     def finished(self, state: State) -> bool:
-        return (
-            state[0].real == self.target.real
-            and state[0].imag == self.target.imag
-        )
+        return state[0] == self.target
 
 
+@cached_parser(version=2)
 def parse_maze(path: Path) -> tuple[State, Maze]:
-    wall_set = set()
-    target = -1
-    start = -1
-    with path.open() as f:
-        for r, row in enumerate(f):
-            for c, v in enumerate(row):
-                pos = complex(r, c)
-                if v == "#":
-                    wall_set.add(pos)
-                elif v == "E":
-                    target = pos
-                elif v == "S":
-                    start = pos
-
-    return (start, 0), Maze(target, wall_set)
+    grid = Grid.from_file(path, pad_value=WALL)
+    target = grid.find(ord("E"))
+    start = grid.find(ord("S"))
+
+    return (start, 0), Maze(target, grid)
 
 
 class Node:
@@ -67,9 +62,7 @@ class Node:
         return self.cost < other.cost
 
 
-def search(
-    state: State, maze: Maze
-) -> tuple[dict[State, State | None], State]:
+def search(state: State, maze: Maze) -> tuple[dict[State, State | None], State]:
     check_heap = list()
     visited = set()
 
@@ -146,7 +139,7 @@ class HistNode:
         self,
         state: State,
         cost: int,
-        hist: set[complex],
+        hist: set[int],
         hcost: float | None = None,
     ) -> None:
         self.state = state
@@ -203,11 +196,12 @@ def search_all_paths(state: State, maze: Maze) -> int:
     return len(in_min_path)
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> tuple[State, Maze]:
+    return parse_maze(path)
 
-    data_path = Path(DATA_PATH_STR)
-    state, maze = parse_maze(data_path)
+
+def solve(data: tuple[State, Maze], part: ProblemParts) -> int:
+    state, maze = data
 
     match part:
         case ProblemParts.Part1:
@@ -217,6 +211,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = search_all_paths(state, maze)
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    data = parse_input(data_path)
+
+    count = solve(data, part)
     print("count:", count)
 
 
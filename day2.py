@@ -1,11 +1,39 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
-from timeit import timeit
+from typing import TYPE_CHECKING
+
+from utils import (
+    ProblemParts,
+    cached_parser,
+    pack_ragged,
+    simple_parser_to_part,
+)
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day2.txt"
 
+CHUNK_BYTES = 1 << 24
+# Inputs larger than this are streamed through a process pool
+PARALLEL_BYTES = 1 << 28
+
+
+@dataclass
+class ChunkCount:
+    pid: int
+    n_reports: int
+    n_safe: int
+    seconds: float
+
 
+@cached_parser(version=1)
 def read_reports(path: Path) -> list[list[int]]:
     levels = []
     with path.open() as f:
@@ -125,40 +153,224 @@ def monotonic_within_jump_num_sat(
     return count
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def chain_removals(
+    level: list[int],
+    min_jump: int = 1,
+    max_jump: int = 3,
+    max_removals: int = 1,
+) -> int:
+    """
+    Fewest levels to remove so that every remaining step is in
+    [min_jump, max_jump]. An answer above `max_removals` only means more than
+    `max_removals` are needed, it is not the exact minimum.
+    """
+    n = len(level)
+    if n == 0:
+        return 0
+
+    # best[i] is the fewest removals before i for a valid chain ending at i.
+    # A step skipping more than max_removals levels can never be in budget,
+    # so only the last max_removals + 1 levels are candidates, O(n * k).
+    best = [0] * n
+    for i in range(n):
+        best_i = i
+        for j in range(max(0, i - max_removals - 1), i):
+            if min_jump <= level[i] - level[j] <= max_jump:
+                best_i = min(best_i, best[j] + i - j - 1)
+
+        best[i] = best_i
+
+    return min(best[i] + n - 1 - i for i in range(n))
+
+
+def tolerant_level_is_safe(
+    level: list[int],
+    min_jump: int = 1,
+    max_jump: int = 3,
+    max_removals: int = 1,
+) -> bool:
+    for direction in (level, [-v for v in level]):
+        removals = chain_removals(direction, min_jump, max_jump, max_removals)
+        if removals <= max_removals:
+            return True
 
-    data_path = Path(DATA_PATH_STR)
-    levels = read_reports(data_path)
+    return False
+
+
+def tolerant_monotonic_within_jump_num_sat(
+    levels: list[list[int]],
+    min_jump: int = 1,
+    max_jump: int = 3,
+    max_removals: int = 1,
+) -> int:
+    count = 0
+
+    for level in levels:
+        is_safe = tolerant_level_is_safe(
+            level, min_jump, max_jump, max_removals
+        )
+        count += int(is_safe)
+
+    return count
 
+
+def batched_level_is_safe(
+    packed: np.ndarray,
+    lengths: np.ndarray,
+    min_jump: int = 1,
+    max_jump: int = 3,
+) -> np.ndarray:
+    import numpy as np
+
+    diffs = np.diff(packed, axis=1)
+    padding = np.arange(diffs.shape[1]) >= (lengths - 1)[:, None]
+
+    # Padding never makes a report unsafe
+    increasing = ((min_jump <= diffs) & (diffs <= max_jump)) | padding
+    decreasing = ((min_jump <= -diffs) & (-diffs <= max_jump)) | padding
+
+    return increasing.all(axis=1) | decreasing.all(axis=1)
+
+
+def batched_monotonic_within_jump_num_sat(
+    levels: list[list[int]],
+    min_jump: int = 1,
+    max_jump: int = 3,
+    error_allowed: bool = False,
+) -> int:
+    import numpy as np
+
+    packed, lengths = pack_ragged(levels)
+    is_safe = batched_level_is_safe(packed, lengths, min_jump, max_jump)
+
+    if error_allowed:
+        # Only the unsafe reports need each single removal checked
+        for i in range(packed.shape[1]):
+            unsafe = np.flatnonzero(~is_safe)
+            if len(unsafe) == 0:
+                break
+
+            removed = np.delete(packed[unsafe], i, axis=1)
+            removed_lengths = lengths[unsafe] - (i < lengths[unsafe])
+            is_safe[unsafe] = batched_level_is_safe(
+                removed, removed_lengths, min_jump, max_jump
+            )
+
+    return int(is_safe.sum())
+
+
+def chunk_ranges(
+    path: Path, chunk_bytes: int = CHUNK_BYTES
+) -> list[tuple[int, int]]:
+    """
+    Byte ranges of about `chunk_bytes` covering the file, each ending just
+    after a newline so that no report is split between two ranges.
+    """
+    size = path.stat().st_size
+
+    ranges = []
+    with path.open("rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size) - 1)
+            f.readline()
+            end = min(f.tell(), size)
+
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def count_range(
+    path: Path, start: int, end: int, part: ProblemParts
+) -> ChunkCount:
+    begin = time.perf_counter()
+
+    with path.open("rb") as f:
+        f.seek(start)
+        chunk = f.read(end - start)
+
+    levels = [list(map(int, row.split())) for row in chunk.splitlines()]
+    levels = [level for level in levels if level]
+
+    n_safe = solve(levels, part)
+
+    return ChunkCount(
+        os.getpid(), len(levels), n_safe, time.perf_counter() - begin
+    )
+
+
+def solve_parallel(
+    path: Path,
+    part: ProblemParts,
+    jobs: int | None = None,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> tuple[int, list[ChunkCount]]:
+    """
+    Count safe reports without holding the whole file, each worker reads
+    and checks its own byte ranges and only the counts come back.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = chunk_ranges(path, chunk_bytes)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(count_range, path, start, end, part)
+            for start, end in ranges
+        ]
+        counts = [f.result() for f in futures]
+
+    return sum(c.n_safe for c in counts), counts
+
+
+def print_throughput(counts: list[ChunkCount]) -> None:
+    per_worker: dict[int, list[ChunkCount]] = defaultdict(list)
+    for c in counts:
+        per_worker[c.pid].append(c)
+
+    for pid, worker_counts in sorted(per_worker.items()):
+        n_reports = sum(c.n_reports for c in worker_counts)
+        seconds = sum(c.seconds for c in worker_counts)
+        print(
+            f"worker {pid}: {len(worker_counts)} chunks, {n_reports} reports, "
+            f"{n_reports / seconds if seconds else 0:,.0f} reports/s",
+            file=sys.stderr,
+        )
+
+
+def parse_input(path: Path) -> list[list[int]]:
+    return read_reports(path)
+
+
+def solve(levels: list[list[int]], part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
-            num_sat = monotonic_within_jump_num_sat(
+            num_sat = batched_monotonic_within_jump_num_sat(
                 levels, min_jump=1, max_jump=3, error_allowed=False
             )
         case ProblemParts.Part2:
-            print(
-                "fast:",
-                timeit(
-                    lambda: fast_monotonic_within_jump_num_sat(
-                        levels, min_jump=1, max_jump=3, error_allowed=True
-                    ),
-                    number=10,
-                ),
-            )
-            print(
-                "brute:",
-                timeit(
-                    lambda: monotonic_within_jump_num_sat(
-                        levels, min_jump=1, max_jump=3, error_allowed=True
-                    ),
-                    number=10,
-                ),
-            )
-            num_sat = fast_monotonic_within_jump_num_sat(
+            num_sat = batched_monotonic_within_jump_num_sat(
                 levels, min_jump=1, max_jump=3, error_allowed=True
             )
 
+    return num_sat
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    if data_path.stat().st_size > PARALLEL_BYTES:
+        num_sat, counts = solve_parallel(data_path, part)
+        print_throughput(counts)
+        print(num_sat)
+        return
+
+    levels = parse_input(data_path)
+
+    num_sat = solve(levels, part)
     print(num_sat)
 
 
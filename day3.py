@@ -1,14 +1,29 @@
+from __future__ import annotations
+
 import copy
+import functools
+import math
+import os
+import re
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from enum import Enum, auto
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
-from utils import ProblemParts, simple_parser_to_part
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day3.txt"
 
+CHUNK_BYTES = 1 << 24
+# Inputs larger than this are scanned in chunks instead of read whole
+STREAM_BYTES = 1 << 30
+# Inputs larger than this are split across a process pool
+PARALLEL_BYTES = 1 << 28
+
 
 # def read_code(path: Path) -> list[str]:
+@cached_parser(version=1)
 def read_code(path: Path) -> str:
     strs: list[str] = []
     with path.open() as f:
@@ -29,6 +44,18 @@ class State(ABC):
     def predicate(self, t: str) -> bool:
         pass
 
+    @abstractmethod
+    def regex(self) -> str:
+        """
+        Pattern matching the same tokens, values are capturing groups.
+        """
+
+    @abstractmethod
+    def max_width(self) -> int:
+        """
+        Most characters the state can consume.
+        """
+
     def eval(self, tokens: str) -> tuple[ParseRes, State, int | None, str]:
         t = tokens[0]
         parse_res = ParseRes.FullSuccess if self.predicate(t) else ParseRes.Fail
@@ -42,11 +69,18 @@ class CharMatch(State):
     def predicate(self, t: str) -> bool:
         return t == self.char
 
+    def regex(self) -> str:
+        return re.escape(self.char)
+
+    def max_width(self) -> int:
+        return len(self.char)
+
 
 class DigitParse(State):
     def __init__(self, early_end: str, max_count: int = 3) -> None:
         assert max_count >= 1
 
+        self.max_count = max_count
         self.count = max_count
         self.early_end = early_end
         self.value_str = ""
@@ -54,6 +88,13 @@ class DigitParse(State):
     def predicate(self, t: str) -> bool:
         return t.isdigit()
 
+    def regex(self) -> str:
+        # The early end is matched by the state that follows
+        return rf"([0-9]{{1,{self.max_count}}})"
+
+    def max_width(self) -> int:
+        return self.max_count
+
     def eval(self, tokens: str) -> tuple[ParseRes, State, int | None, str]:
         t = tokens[0]
         next_tokens = tokens[1:]
@@ -107,7 +148,6 @@ class StateMachine:
                         self.values.append(value)
                 else:
                     self.count += self.values[0] * self.values[1]
-                    print(self.values, self.count)
 
                     # Reset
                     self.cur_state = copy.deepcopy(self.states[0])
@@ -125,6 +165,297 @@ def run_state_machine(tokens: str, states: list[State]) -> int:
     return sm.count
 
 
+def compile_states(states: list[State]) -> re.Pattern[str]:
+    return re.compile("".join(state.regex() for state in states))
+
+
+def run_scanner(tokens: str, states: list[State]) -> int:
+    """
+    Same count as run_state_machine in one linear scan, except that a failed
+    match is retried from its next character, so "mmul(2,3)" also counts.
+    """
+    pattern = compile_states(states)
+
+    count = 0
+    for match in pattern.finditer(tokens):
+        count += math.prod(map(int, match.groups()))
+
+    return count
+
+
+@dataclass
+class ScanState:
+    enabled: bool = True
+    count: int = 0
+
+
+@dataclass
+class Instruction:
+    """
+    A token the scanner recognises and what it does to the scan state, given
+    the values parsed by its states. Only instructions with
+    `runs_when_disabled` are looked for while the scan is disabled.
+    """
+
+    name: str
+    states: list[State]
+    action: Callable[[ScanState, list[int]], None]
+    runs_when_disabled: bool = False
+
+    def max_width(self) -> int:
+        return sum(state.max_width() for state in self.states)
+
+
+def literal_states(literal: str) -> list[State]:
+    return [CharMatch(char) for char in literal]
+
+
+def mul_action(scan: ScanState, values: list[int]) -> None:
+    scan.count += math.prod(values)
+
+
+def enable_action(scan: ScanState, values: list[int]) -> None:
+    scan.enabled = True
+
+
+def disable_action(scan: ScanState, values: list[int]) -> None:
+    scan.enabled = False
+
+
+Dispatch = dict[int, tuple[Instruction, int, int]]
+
+
+def compile_instructions(
+    instructions: list[Instruction], as_bytes: bool = False
+) -> tuple[re.Pattern, Dispatch]:
+    """
+    One alternation of all the instructions. An empty group closing each
+    alternative marks which one matched, as the last matched group. A group
+    opening it instead would hide the literal prefixes that let the regex
+    skip ahead quickly.
+    """
+    alternatives = []
+    dispatch: Dispatch = dict()
+    n_groups = 0
+    for instruction in instructions:
+        regex = "".join(state.regex() for state in instruction.states)
+        n_values = re.compile(regex).groups
+
+        alternatives.append(f"{regex}()")
+        marker_idx = n_groups + n_values + 1
+        dispatch[marker_idx] = (instruction, n_groups, n_groups + n_values)
+        n_groups = marker_idx
+
+    # With no instructions, a pattern that never matches
+    regex = "|".join(alternatives) if alternatives else "(?!)"
+
+    return re.compile(regex.encode() if as_bytes else regex), dispatch
+
+
+class Scanner:
+    """
+    Runs a set of instructions over the input in one pass, applying the
+    action of each token found in order of appearance.
+    """
+
+    def __init__(self, instructions: list[Instruction]) -> None:
+        self.instructions = instructions
+        self.max_width = max(i.max_width() for i in instructions)
+
+        # Keyed by the enabled flag, then by whether the input is bytes
+        self.tables = {
+            enabled: {
+                as_bytes: compile_instructions(
+                    [
+                        i
+                        for i in instructions
+                        if enabled or i.runs_when_disabled
+                    ],
+                    as_bytes,
+                )
+                for as_bytes in (False, True)
+            }
+            for enabled in (True, False)
+        }
+
+    def scan_until(
+        self, tokens: str | bytes, scan: ScanState, limit: int, pos: int = 0
+    ) -> int:
+        """
+        Apply the tokens that start in [pos, limit), returning the end of the
+        last one applied.
+        """
+        as_bytes = isinstance(tokens, bytes)
+
+        while True:
+            pattern, dispatch = self.tables[scan.enabled][as_bytes]
+            match = pattern.search(tokens, pos)
+            if match is None or match.start() >= limit:
+                break
+
+            instruction, start, end = dispatch[match.lastindex or 0]
+            values = match.groups()[start:end]
+            instruction.action(scan, [int(v) for v in values])
+            pos = match.end()
+
+        return pos
+
+    def scan(
+        self, tokens: str | bytes, scan: ScanState | None = None
+    ) -> ScanState:
+        if scan is None:
+            scan = ScanState()
+
+        self.scan_until(tokens, scan, len(tokens))
+
+        return scan
+
+    def scan_chunks(
+        self, chunks: Iterable[bytes], scan: ScanState | None = None
+    ) -> ScanState:
+        """
+        Scan a stream of chunks in bounded memory. A token starting within
+        max_width - 1 of the end of the buffer may be cut off, so it is
+        left in the tail carried on to the next chunk.
+        """
+        if scan is None:
+            scan = ScanState()
+
+        tail = b""
+        for chunk in chunks:
+            buffer = tail + chunk
+            limit = len(buffer) - self.max_width + 1
+
+            pos = self.scan_until(buffer, scan, limit)
+            tail = buffer[max(pos, limit, 0) :]
+
+        self.scan_until(tail, scan, len(tail))
+
+        return scan
+
+
+def iter_chunks(path: Path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_bytes):
+            yield chunk
+
+
+@dataclass
+class EntryScan:
+    """
+    Result of scanning a range from one entry state. Positions are absolute.
+    """
+
+    count: int
+    exit_enabled: bool
+    first_start: int | None
+    last_end: int | None
+
+
+@functools.cache
+def part_scanner(part: ProblemParts) -> Scanner:
+    return Scanner(PART_INSTRUCTIONS[part])
+
+
+def read_range(path: Path, start: int, end: int) -> bytes:
+    with path.open("rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def scan_range_from(
+    scanner: Scanner,
+    buffer: bytes,
+    offset: int,
+    limit: int,
+    enabled: bool,
+    pos: int = 0,
+) -> EntryScan:
+    scan = ScanState(enabled=enabled)
+
+    pattern, _ = scanner.tables[enabled][True]
+    first = pattern.search(buffer, pos)
+    first_start = None
+    if first is not None and first.start() < limit:
+        first_start = offset + first.start()
+
+    end = scanner.scan_until(buffer, scan, limit, pos)
+    last_end = offset + end if first_start is not None else None
+
+    return EntryScan(scan.count, scan.enabled, first_start, last_end)
+
+
+def scan_range(
+    path: Path, start: int, end: int, part: ProblemParts
+) -> dict[bool, EntryScan]:
+    """
+    Scan the tokens starting in [start, end) from both entry states, as the
+    state at `start` is only known once the earlier ranges are merged.
+    Tokens starting near `end` are read in full from the overlap.
+    """
+    scanner = part_scanner(part)
+    buffer = read_range(path, start, end + scanner.max_width - 1)
+
+    return {
+        enabled: scan_range_from(scanner, buffer, start, end - start, enabled)
+        for enabled in (True, False)
+    }
+
+
+def solve_parallel(
+    path: Path,
+    part: ProblemParts,
+    jobs: int | None = None,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> int:
+    """
+    Scan byte ranges in a process pool and merge them in order, following
+    the enabled state from one range into the next. Counts are summed, so
+    instruction actions must only add to the count.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    scanner = part_scanner(part)
+    chunk_bytes = max(chunk_bytes, scanner.max_width)
+
+    size = path.stat().st_size
+    ranges = [
+        (start, min(start + chunk_bytes, size))
+        for start in range(0, size, chunk_bytes)
+    ]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(scan_range, path, start, end, part)
+            for start, end in ranges
+        ]
+        range_scans = [f.result() for f in futures]
+
+    count, enabled, prev_end = 0, True, 0
+    for (start, end), entries in zip(ranges, range_scans):
+        entry = entries[enabled]
+
+        # A token straddling into this range hides any token starting
+        # inside it, so the range is scanned again from where it ended
+        if entry.first_start is not None and entry.first_start < prev_end:
+            buffer = read_range(path, start, end + scanner.max_width - 1)
+            entry = scan_range_from(
+                scanner,
+                buffer,
+                start,
+                end - start,
+                enabled,
+                pos=prev_end - start,
+            )
+
+        count += entry.count
+        enabled = entry.exit_enabled
+        if entry.last_end is not None:
+            prev_end = entry.last_end
+
+    return count
+
+
 def do_dont_filter(tokens: str) -> str:
     """
     Could have made this a state machine as well...
@@ -159,27 +490,57 @@ def do_dont_filter(tokens: str) -> str:
     return "|".join(filtered_list)
 
 
+MUL_STATES: list[State] = [
+    CharMatch("m"),
+    CharMatch("u"),
+    CharMatch("l"),
+    CharMatch("("),
+    DigitParse(",", max_count=3),
+    CharMatch(","),
+    DigitParse(")", max_count=3),
+    CharMatch(")"),
+]
+
+
+MUL = Instruction("mul", MUL_STATES, mul_action)
+DO = Instruction("do", literal_states("do()"), enable_action, True)
+DONT = Instruction("don't", literal_states("don't()"), disable_action, True)
+
+PART_INSTRUCTIONS = {
+    ProblemParts.Part1: [MUL],
+    ProblemParts.Part2: [MUL, DO, DONT],
+}
+
+
+def parse_input(path: Path) -> str:
+    return read_code(path)
+
+
+def solve(code: str, part: ProblemParts) -> int:
+    scanner = Scanner(PART_INSTRUCTIONS[part])
+    return scanner.scan(code).count
+
+
+def solve_streaming(
+    path: Path, part: ProblemParts, chunk_bytes: int = CHUNK_BYTES
+) -> int:
+    scanner = Scanner(PART_INSTRUCTIONS[part])
+    return scanner.scan_chunks(iter_chunks(path, chunk_bytes)).count
+
+
 def main() -> None:
     part = simple_parser_to_part()
 
     data_path = Path(DATA_PATH_STR)
-    code = read_code(data_path)
-
-    if part == ProblemParts.Part2:
-        code = do_dont_filter(code)
-
-    states = [
-        CharMatch("m"),
-        CharMatch("u"),
-        CharMatch("l"),
-        CharMatch("("),
-        DigitParse(",", max_count=3),
-        CharMatch(","),
-        DigitParse(")", max_count=3),
-        CharMatch(")"),
-    ]
+    size = data_path.stat().st_size
+    if size > PARALLEL_BYTES and (os.cpu_count() or 1) > 1:
+        count = solve_parallel(data_path, part)
+    elif size > STREAM_BYTES:
+        count = solve_streaming(data_path, part)
+    else:
+        code = parse_input(data_path)
+        count = solve(code, part)
 
-    count = run_state_machine(code, states)
     print(count)
 
 
@@ -1,12 +1,38 @@
+from __future__ import annotations
+
+import mmap
+import os
+from collections import Counter, deque
 from dataclasses import dataclass
 from itertools import product
 from pathlib import Path
-from typing import Protocol
+from typing import TYPE_CHECKING, Iterable, Iterator, Protocol
+
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day4.txt"
 
+# Inputs larger than this are mapped rather than read into strings
+MMAP_BYTES = 1 << 26
+# Inputs larger than this are searched in row bands by a process pool
+PARALLEL_BYTES = 1 << 28
+BAND_BYTES = 1 << 24
+
+# (row, col) steps of the 8 reading directions
+DIRECTIONS = [
+    (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)
+]
+# Half of them, pointing down or right. Together with the reversed word they
+# cover all 8, and each match then starts at its top cell.
+FORWARD_DIRECTIONS = [(0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Stencil cells holding this match any letter
+WILDCARD = "."
+X_MAS = ["M.S", ".A.", "M.S"]
+
 
 @dataclass
 class WordArray:
@@ -19,15 +45,55 @@ class WordArrayPosPredicate(Protocol):
     def __call__(self, i: int, j: int, word_array: WordArray) -> int: ...
 
 
+@cached_parser(version=2)
 def read_word_array(path: Path) -> WordArray:
     word_array: list[str] = []
     with path.open() as f:
         for row in f:
-            word_array.append(row)
+            word_array.append(row.rstrip("\n"))
 
     return WordArray(word_array, len(word_array), len(word_array[0]))
 
 
+def map_char_array(path: Path) -> np.ndarray:
+    """
+    The grid as a read-only 2-D uint8 view over the mapped file, with a row
+    stride of the line length so the newlines are stepped over. The map
+    stays open for as long as the view is referenced.
+    """
+    import numpy as np
+
+    size = path.stat().st_size
+    if size == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    with path.open("rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data = np.frombuffer(buffer, dtype=np.uint8)
+
+    n_cols = buffer.find(b"\n")
+    if n_cols == -1:
+        n_cols = size
+    line_len = n_cols + 1
+    n_rows = -(-size // line_len)
+
+    # Every line ends in a newline, except perhaps the last
+    missing_newline = int(buffer[size - 1] != ord("\n"))
+    if size != n_rows * line_len - missing_newline:
+        raise ValueError(f"{path} has lines of different lengths")
+
+    grid = np.lib.stride_tricks.as_strided(
+        data, shape=(n_rows, n_cols), strides=(line_len, 1), writeable=False
+    )
+
+    newlines = data[n_cols::line_len]
+    if (newlines != ord("\n")).any():
+        raise ValueError(f"{path} has lines of different lengths")
+
+    return grid
+
+
 global_check = [[]] * 10
 for i in range(len(global_check)):
     global_check[i] = ["."] * 10
@@ -84,9 +150,9 @@ def count_x_mas_at_pos(i: int, j: int, word_array: WordArray) -> int:
     word = "MAS"
 
     has_right_space = j + 1 < word_array.n_cols
-    has_left_space = 0 <= j
+    has_left_space = 0 < j
     has_down_space = i + 1 < word_array.n_rows
-    has_up_space = 0 <= i
+    has_up_space = 0 < i
 
     has_space = (
         has_right_space and has_left_space and has_down_space and has_up_space
@@ -111,21 +177,281 @@ def count_xmas_all(word_array: WordArray, pred: WordArrayPosPredicate) -> int:
     return sum(pred(i, j, word_array) for i, j in full_iter)
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def char_array(word_array: WordArray) -> np.ndarray:
+    """
+    The grid as a 2-D uint8 array, without newlines. Short rows are padded
+    with NUL, which no word contains.
+    """
+    import numpy as np
+
+    rows = word_array.array
+    width = max((len(row) for row in rows), default=0)
+
+    flat = "".join(row.ljust(width, "\0") for row in rows).encode()
+    return np.frombuffer(flat, dtype=np.uint8).reshape(len(rows), width)
+
+
+def count_word(
+    grid: np.ndarray,
+    word: str,
+    directions: list[tuple[int, int]] = DIRECTIONS,
+    start_rows: int | None = None,
+) -> int:
+    """
+    Occurrences of `word` reading along each of `directions`. For each
+    direction the cells where a word could start are compared a letter at
+    a time against the grid shifted by that letter's offset. Only words
+    starting in the first `start_rows` rows are counted, if given.
+    """
+    import numpy as np
+
+    n_rows, n_cols = grid.shape
+    span = len(word) - 1
+    letters = np.frombuffer(word.encode(), dtype=np.uint8)
+
+    count = 0
+    for dr, dc in directions:
+        # Start cells that leave room for the whole word
+        r0, r1 = max(0, -dr * span), n_rows - max(0, dr * span)
+        c0, c1 = max(0, -dc * span), n_cols - max(0, dc * span)
+        if r1 <= r0 or c1 <= c0:
+            continue
+
+        found = np.ones((r1 - r0, c1 - c0), dtype=bool)
+        for k, letter in enumerate(letters):
+            shifted = grid[r0 + dr * k : r1 + dr * k, c0 + dc * k : c1 + dc * k]
+            found &= shifted == letter
+
+        if start_rows is not None:
+            found = found[: max(0, start_rows - r0)]
+
+        count += int(found.sum())
+
+    return count
 
-    data_path = Path(DATA_PATH_STR)
-    word_array = read_word_array(data_path)
 
-    # print("----")
-    # print(count_xmas_at_pos(6, 4, word_array))
-    # print("----")
+def count_words(
+    grid: np.ndarray, words: list[str], start_rows: int | None = None
+) -> int:
+    """
+    Occurrences of each word in all 8 directions, counted from the cell
+    each starts or ends at, whichever is on top.
+    """
+    return sum(
+        count_word(grid, w, FORWARD_DIRECTIONS, start_rows)
+        + count_word(grid, w[::-1], FORWARD_DIRECTIONS, start_rows)
+        for w in words
+    )
+
+
+class WordAutomaton:
+    """
+    Aho-Corasick automaton over byte strings, compiled to a full DFA so each
+    byte of a line is a single lookup whatever the number of words.
+    """
+
+    def __init__(self, words: Iterable[bytes]) -> None:
+        # Each word counts once per time it was given
+        weights = Counter(words)
+
+        goto: list[dict[int, int]] = [dict()]
+        self.out = [0]
+        for word, weight in weights.items():
+            state = 0
+            for b in word:
+                if b not in goto[state]:
+                    goto.append(dict())
+                    self.out.append(0)
+                    goto[state][b] = len(goto) - 1
+                state = goto[state][b]
+
+            self.out[state] += weight
+
+        # Breadth first, so the fail target of a state is complete before it.
+        # Children of the root fail to the root.
+        self.delta = [dict(goto[0])] + [dict() for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+
+            # Words ending at a suffix of this state end here too
+            self.out[state] += self.out[fail[state]]
+
+            # Missing transitions follow the fail state's, which are all known
+            self.delta[state] = dict(self.delta[fail[state]])
+            for b, next_state in goto[state].items():
+                fail[next_state] = self.delta[fail[state]].get(b, 0)
+                self.delta[state][b] = next_state
+                queue.append(next_state)
+
+    def count(self, line: bytes) -> int:
+        delta, out = self.delta, self.out
+
+        state, count = 0, 0
+        for b in line:
+            state = delta[state].get(b, 0)
+            count += out[state]
+
+        return count
+
+
+def grid_lines(grid: np.ndarray) -> Iterator[bytes]:
+    """
+    Every row, column, diagonal and anti-diagonal, read in one direction.
+    """
+    import numpy as np
+
+    n_rows, n_cols = grid.shape
+    flipped = np.fliplr(grid)
+
+    yield from (row.tobytes() for row in grid)
+    yield from (col.tobytes() for col in grid.T)
+    for k in range(-n_rows + 1, n_cols):
+        yield grid.diagonal(k).tobytes()
+        yield flipped.diagonal(k).tobytes()
+
+
+def count_dictionary(grid: np.ndarray, words: list[str]) -> int:
+    """
+    Occurrences of every word in all 8 directions, as count_words, in one
+    pass over each line. Reversed words stand in for the opposite direction.
+    """
+    patterns = [word.encode() for word in words]
+    automaton = WordAutomaton(patterns + [p[::-1] for p in patterns])
+
+    return sum(automaton.count(line) for line in grid_lines(grid))
+
+
+def rotate_stencil(stencil: tuple[str, ...]) -> tuple[str, ...]:
+    # Clockwise: the first column read upwards becomes the first row
+    return tuple("".join(col) for col in zip(*stencil[::-1]))
+
+
+def stencil_variants(
+    stencil: list[str], rotations: bool = False, reflections: bool = False
+) -> list[tuple[str, ...]]:
+    """
+    The distinct stencils reached by the requested symmetries, e.g. the 4
+    rotations of X_MAS are all different but its reflections add nothing.
+    """
+    variants = [tuple(stencil)]
+    if reflections:
+        variants.append(tuple(row[::-1] for row in stencil))
+
+    if rotations:
+        for variant in list(variants):
+            for _ in range(3):
+                variant = rotate_stencil(variant)
+                variants.append(variant)
+
+    return list(dict.fromkeys(variants))
+
+
+def count_stencil(
+    grid: np.ndarray,
+    stencil: list[str],
+    rotations: bool = False,
+    reflections: bool = False,
+    start_rows: int | None = None,
+) -> int:
+    """
+    Placements of the stencil, or any of its variants, where every cell that
+    is not a WILDCARD matches the grid. Each variant ANDs the comparisons of
+    the grid shifted by each such cell's offset. Only placements with their
+    top row among the first `start_rows` are counted, if given.
+    """
+    import numpy as np
+
+    n_rows, n_cols = grid.shape
+
+    count = 0
+    for variant in stencil_variants(stencil, rotations, reflections):
+        height, width = len(variant), max(map(len, variant))
+        if height > n_rows or width > n_cols:
+            continue
+
+        found = np.ones((n_rows - height + 1, n_cols - width + 1), dtype=bool)
+        for dr, row in enumerate(variant):
+            for dc, letter in enumerate(row):
+                if letter == WILDCARD:
+                    continue
+
+                shifted = grid[
+                    dr : dr + found.shape[0], dc : dc + found.shape[1]
+                ]
+                found &= shifted == ord(letter)
+
+        count += int(found[:start_rows].sum())
 
+    return count
+
+
+def parse_input(path: Path) -> WordArray:
+    return read_word_array(path)
+
+
+def solve_grid(
+    grid: np.ndarray, part: ProblemParts, start_rows: int | None = None
+) -> int:
     match part:
         case ProblemParts.Part1:
-            count = count_xmas_all(word_array, count_xmas_at_pos)
+            count = count_words(grid, ["XMAS"], start_rows)
         case ProblemParts.Part2:
-            count = count_xmas_all(word_array, count_x_mas_at_pos)
+            count = count_stencil(
+                grid, X_MAS, rotations=True, start_rows=start_rows
+            )
+
+    return count
+
+
+def solve(word_array: WordArray, part: ProblemParts) -> int:
+    return solve_grid(char_array(word_array), part)
+
+
+def count_band(path: Path, start: int, end: int, part: ProblemParts) -> int:
+    # Rows past the band let matches starting in it be read in full
+    overlap = max(len("XMAS"), len(X_MAS)) - 1
+    grid = map_char_array(path)
+
+    return solve_grid(grid[start : end + overlap], part, end - start)
+
+
+def solve_banded(
+    path: Path,
+    part: ProblemParts,
+    jobs: int | None = None,
+    band_bytes: int = BAND_BYTES,
+) -> int:
+    """
+    Search bands of rows of the mapped grid in a process pool. A match is
+    counted by the band holding its top row.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_rows, n_cols = map_char_array(path).shape
+    band_rows = max(1, band_bytes // (n_cols + 1))
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(count_band, path, start, start + band_rows, part)
+            for start in range(0, n_rows, band_rows)
+        ]
+        return sum(f.result() for f in futures)
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    size = data_path.stat().st_size
+    if size > PARALLEL_BYTES and (os.cpu_count() or 1) > 1:
+        count = solve_banded(data_path, part)
+    elif size > MMAP_BYTES:
+        count = solve_grid(map_char_array(data_path), part)
+    else:
+        word_array = parse_input(data_path)
+        count = solve(word_array, part)
 
     print("count:", count)
 
@@ -1,25 +1,198 @@
+from __future__ import annotations
+
+import heapq
 from functools import cmp_to_key
+from itertools import chain
 from pathlib import Path
-from typing import DefaultDict
+from typing import TYPE_CHECKING, AbstractSet, DefaultDict
+
+from utils import (
+    ProblemParts,
+    cached_parser,
+    pack_ragged,
+    simple_parser_to_part,
+)
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day5.txt"
 
+NO_RULES: frozenset[int] = frozenset()
+
+# Rule sets over more pages than this are not expanded to a dense matrix
+DENSE_RULE_PAGES = 1 << 12
+# Largest page number mapped to its id through a lookup table
+LOOKUP_PAGES = 1 << 20
+# Bound on the update x word cells gathered at once
+GATHER_WORDS = 1 << 22
+POOL_CHUNK_UPDATES = 1 << 14
+
 
 class BreakRules:
     def __init__(self, rule_tuples: list[tuple[int, int]]) -> None:
-        self.break_rule_dict = DefaultDict(set)
+        break_rule_dict: DefaultDict[int, set[int]] = DefaultDict(set)
         for left, right in rule_tuples:
-            self.break_rule_dict[right].add(left)
+            break_rule_dict[right].add(left)
+
+        # A plain dict, looking up a page without rules must not insert it
+        self.break_rule_dict = dict(break_rule_dict)
 
-    def __call__(self, x: int) -> set[int]:
-        return self.break_rule_dict[x]
+        # Pages with any rule get a dense id, and the pages that must come
+        # before each one are a bitset over those ids
+        pages = sorted({page for rule in rule_tuples for page in rule})
+        self.page_ids = {page: i for i, page in enumerate(pages)}
+        self.before_masks = [0] * len(pages)
+        for left, right in rule_tuples:
+            self.before_masks[self.page_ids[right]] |= 1 << self.page_ids[left]
+
+    def __call__(self, x: int) -> AbstractSet[int]:
+        return self.break_rule_dict.get(x, NO_RULES)
 
     def is_in(self, x: int) -> bool:
         return x in self.break_rule_dict
 
+    def dense_words(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The bitsets as a dense bit matrix of uint64 words, one row per page
+        id: the pages that must precede it, and its own bit. One extra id,
+        len(page_ids), stands for any page without rules and for padding,
+        and has neither.
+        """
+        import numpy as np
+
+        n_ids = len(self.page_ids)
+        n_words = max(1, -(-n_ids // 64))
+
+        def to_words(masks: list[int]) -> np.ndarray:
+            data = b"".join(m.to_bytes(8 * n_words, "little") for m in masks)
+            words = np.frombuffer(data, dtype="<u8").reshape(-1, n_words)
+            return words.astype(np.uint64)
+
+        before_words = to_words(self.before_masks + [0])
+        id_words = to_words([1 << i for i in range(n_ids)] + [0])
+
+        return before_words, id_words
+
+    def dense_ids(self, values: np.ndarray) -> np.ndarray:
+        import numpy as np
+
+        n_ids = len(self.page_ids)
+        if n_ids == 0:
+            return np.zeros_like(values)
+
+        # Ids were given in sorted page order, so an id is a page's rank
+        keys = np.fromiter(self.page_ids, dtype=np.int64, count=n_ids)
+
+        if 0 <= keys[0] and keys[-1] <= LOOKUP_PAGES:
+            # Small page numbers, a lookup table beats a binary search. The
+            # slot past the largest page catches every larger one.
+            lookup = np.full(int(keys[-1]) + 2, n_ids, dtype=np.int64)
+            lookup[keys] = np.arange(n_ids)
+
+            ids = lookup[values.clip(0, len(lookup) - 1)]
+            ids[values < 0] = n_ids
+            return ids
+
+        ids = np.searchsorted(keys, values).clip(max=n_ids - 1)
+        ids[keys[ids] != values] = n_ids
+
+        return ids
+
+    def page_mask(self, page: list[int]) -> int:
+        mask = 0
+        for x in page:
+            i = self.page_ids.get(x)
+            if i is not None:
+                mask |= 1 << i
+
+        return mask
+
+    def is_ordered(self, page: list[int]) -> bool:
+        # No page may have one that must precede it among the pages after it,
+        # a single AND with the mask of the pages seen so far from the end
+        page_ids, before_masks = self.page_ids, self.before_masks
+
+        later = 0
+        for x in reversed(page):
+            i = page_ids.get(x)
+            if i is None:
+                continue
+
+            if before_masks[i] & later:
+                return False
+            later |= 1 << i
+
+        return True
+
+    def induced_subgraph(self, page: list[int]) -> list[int]:
+        """
+        The rules between the pages of one update, as the bitset of pages
+        each page must follow. O(n) big int operations.
+        """
+        mask = self.page_mask(page)
+        return [
+            self.before_masks[i] & mask if i is not None else 0
+            for i in map(self.page_ids.get, page)
+        ]
+
+    def topological_order(
+        self, page: list[int], stop: int | None = None
+    ) -> list[int]:
+        """
+        Kahn's algorithm over the induced subgraph, taking the earliest ready
+        position first so that an ordered update comes out unchanged. Stops
+        after `stop` pages, e.g. once the middle page is known.
+        """
+        befores = self.induced_subgraph(page)
+        in_degree = [before.bit_count() for before in befores]
+        stop = len(page) if stop is None else stop
+
+        # Rules between every pair, as in the puzzle, leave a single order
+        # where each page is placed by how many pages must precede it. It is
+        # only that order if each page must follow exactly the pages placed
+        # before it, a cycle can give the same in-degrees.
+        if sorted(in_degree) == list(range(len(page))):
+            order = [0] * len(page)
+            for i, d in enumerate(in_degree):
+                order[d] = i
+
+            earlier = 0
+            for i in order:
+                if befores[i] != earlier:
+                    break
+                earlier |= self.page_mask([page[i]])
+            else:
+                return [page[i] for i in order[:stop]]
+
+        pos = {self.page_ids.get(x): i for i, x in enumerate(page)}
+        successors: list[list[int]] = [[] for _ in page]
+        for i, before in enumerate(befores):
+            while before:
+                low = before & -before
+                successors[pos[low.bit_length() - 1]].append(i)
+                before ^= low
+
+        ready = [i for i, d in enumerate(in_degree) if d == 0]
+        heapq.heapify(ready)
+
+        order = []
+        while ready and len(order) < stop:
+            i = heapq.heappop(ready)
+            order.append(page[i])
+
+            for j in successors[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    heapq.heappush(ready, j)
+
+        if len(order) < stop:
+            raise ValueError(f"Rules for {page} contain a cycle")
+
+        return order
+
 
+@cached_parser(version=2)
 def read_problem(path: Path) -> tuple[BreakRules, list[list[int]]]:
     rules = []
     pages = []
@@ -89,18 +262,147 @@ def fix_and_sum_mids(rules: BreakRules, pages: list[list[int]]) -> int:
     return count
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def topo_sum_true_mids(rules: BreakRules, pages: list[list[int]]) -> int:
+    count = 0
 
-    data_path = Path(DATA_PATH_STR)
-    rules, pages = read_problem(data_path)
+    for page in pages:
+        if rules.is_ordered(page):
+            count += page[len(page) // 2]
+
+    return count
+
+
+def topo_fix_and_sum_mids(rules: BreakRules, pages: list[list[int]]) -> int:
+    count = 0
+
+    for page in pages:
+        if not rules.is_ordered(page):
+            mid = len(page) // 2
+            count += rules.topological_order(page, stop=mid + 1)[mid]
+
+    return count
+
+
+pool_rules: BreakRules | None = None
+
+
+def set_pool_rules(rules: BreakRules) -> None:
+    # Sent once per worker rather than with every chunk
+    global pool_rules
+    pool_rules = rules
+
+
+def pool_is_ordered(pages: list[list[int]]) -> list[bool]:
+    assert pool_rules is not None
+    return [pool_rules.is_ordered(page) for page in pages]
+
+
+def pooled_validate(
+    rules: BreakRules, pages: list[list[int]], jobs: int | None = None
+) -> tuple[np.ndarray, int]:
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=set_pool_rules, initargs=(rules,)
+    ) as executor:
+        chunks = [
+            pages[i : i + POOL_CHUNK_UPDATES]
+            for i in range(0, len(pages), POOL_CHUNK_UPDATES)
+        ]
+        valid = np.fromiter(
+            chain.from_iterable(executor.map(pool_is_ordered, chunks)),
+            dtype=bool,
+            count=len(pages),
+        )
+
+    mid_sum = sum(page[len(page) // 2] for page, v in zip(pages, valid) if v)
+    return valid, mid_sum
+
+
+def batched_validate(
+    rules: BreakRules, pages: list[list[int]]
+) -> tuple[np.ndarray, int]:
+    """
+    Which updates follow every rule, and the sum of their middle pages.
+    Walking the positions from the end, every update keeps the bit matrix
+    row of the pages after the current one, and a violation is a non-zero
+    AND with the current page's row of pages that must precede it. Rule
+    sets too large for a dense matrix are checked with bitsets in a
+    process pool instead.
+    """
+    import numpy as np
+
+    if len(rules.page_ids) > DENSE_RULE_PAGES:
+        return pooled_validate(rules, pages)
+
+    before_words, id_words = rules.dense_words()
+    n_words = before_words.shape[1]
+
+    packed, lengths = pack_ragged(pages)
+    n_updates, width = packed.shape
+
+    ids = rules.dense_ids(packed)
+    ids[np.arange(width) >= lengths[:, None]] = len(rules.page_ids)
+
+    valid = np.ones(n_updates, dtype=bool)
+    batch_rows = max(1, GATHER_WORDS // n_words)
+    for start in range(0, n_updates, batch_rows):
+        batch = ids[start : start + batch_rows]
+
+        later = np.zeros((len(batch), n_words), dtype=np.uint64)
+        violated = np.zeros(len(batch), dtype=bool)
+        for col in reversed(range(width)):
+            col_ids = batch[:, col]
+            violated |= (before_words[col_ids] & later).any(axis=1)
+            later |= id_words[col_ids]
+
+        valid[start : start + batch_rows] = ~violated
+
+    mids = packed[np.arange(n_updates), lengths // 2]
+    return valid, int(mids[valid].sum())
+
+
+def batched_sum_true_mids(rules: BreakRules, pages: list[list[int]]) -> int:
+    _, mid_sum = batched_validate(rules, pages)
+    return mid_sum
+
+
+def batched_fix_and_sum_mids(rules: BreakRules, pages: list[list[int]]) -> int:
+    valid, _ = batched_validate(rules, pages)
+
+    count = 0
+    for page, is_valid in zip(pages, valid):
+        if not is_valid:
+            mid = len(page) // 2
+            count += rules.topological_order(page, stop=mid + 1)[mid]
+
+    return count
+
+
+def parse_input(path: Path) -> tuple[BreakRules, list[list[int]]]:
+    return read_problem(path)
+
+
+def solve(data: tuple[BreakRules, list[list[int]]], part: ProblemParts) -> int:
+    rules, pages = data
 
     match part:
         case ProblemParts.Part1:
-            count = sum_true_mids(rules, pages)
+            count = batched_sum_true_mids(rules, pages)
         case ProblemParts.Part2:
-            count = fix_and_sum_mids(rules, pages)
+            count = batched_fix_and_sum_mids(rules, pages)
+
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    data = parse_input(data_path)
 
+    count = solve(data, part)
     print("count:", count)
 
 
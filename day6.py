@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import copy
+from array import array
 from enum import Enum
 from itertools import product
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Generator, Iterator
 
-import numpy as np
+from grid import NORTH, Grid
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
-from utils import ProblemParts, simple_parser_to_part
+if TYPE_CHECKING:
+    import numpy as np
 
 DATA_PATH_STR = "data/day6.txt"
 
+OUTSIDE = 0
+OPEN = ord(".")
+WALL = ord("#")
+GUARD = ord("^")
+VISITED = ord("X")
+
+# A walk is a run of straight moves, from a cell to where the guard stops
+Segment = tuple[int, int, int]  # Start cell, direction, stop cell
+
 
 class Direction(Enum):
     North = (-1, 0)
@@ -35,6 +47,8 @@ class Direction(Enum):
 
 class Maze:
     def __init__(self, maze_list: list[list[int]]) -> None:
+        import numpy as np
+
         self.maze_array = np.array(maze_list, dtype=np.bool)
 
     def has_wall(self, pos: tuple[int, int]) -> bool:
@@ -43,12 +57,16 @@ class Maze:
 
 class Tracker:
     def __init__(self, start_pos: tuple[int, int], maze: Maze) -> None:
+        import numpy as np
+
         self.start_pos = np.array(start_pos)
         self.maze_shape = maze.maze_array.shape
 
         self.reset_tracker()
 
     def reset_tracker(self) -> None:
+        import numpy as np
+
         self.direction = Direction.North
         self.pos = np.array(self.start_pos)
         self.tracking_array = np.zeros(self.maze_shape, dtype=np.bool)
@@ -124,12 +142,14 @@ class MazeChangeGenerator:
             self.maze.maze_array[*pos] = 0
 
 
+@cached_parser(version=2)
 def read_maze(path: Path) -> tuple[Maze, Tracker]:
     start_pos = (0, 0)
     maze_list = []
 
     with path.open() as f:
         for i, row in enumerate(f):
+            row = row.rstrip("\r\n")
             if "^" in row:
                 j = row.index("^")
                 start_pos = (i, j)
@@ -192,20 +212,199 @@ def count_potential_loops(maze: Maze, tracker: Tracker) -> int:
     return counter
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+class Lab:
+    """
+    The guard's map with, for every cell and direction, the cell the guard
+    stops at when walking that way, so each straight run is a single lookup.
+    """
+
+    def __init__(self, grid: Grid, start: int) -> None:
+        self.grid = grid
+        self.start = start
+        self.jumps = [self.jump_table(d) for d in range(4)]
+
+    def jump_table(self, direction: int) -> array:
+        grid = self.grid
+        offset = grid.offsets[direction]
+
+        # Fill from the far side, so the neighbour ahead is always done first
+        rows, cols = range(grid.n_rows), range(grid.n_cols)
+        if offset > 0:
+            rows, cols = rows[::-1], cols[::-1]
+
+        cells = grid.cells
+        jump = array("i", range(len(cells)))
+        for r in rows:
+            row_start = grid.index(r, 0)
+            for c in cols:
+                idx = row_start + c
+                if cells[idx + offset] == OPEN:
+                    jump[idx] = jump[idx + offset]
+
+        return jump
+
+    def stop(self, pos: int, direction: int, obstacle: int | None) -> int:
+        stop = self.jumps[direction][pos]
+        if obstacle is None:
+            return stop
+
+        # The extra obstacle cuts the run short if it is between pos and stop
+        offset = self.grid.offsets[direction]
+        ahead = (obstacle - pos) * (1 if offset > 0 else -1)
+        length = (stop - pos) * (1 if offset > 0 else -1)
+        if 0 < ahead <= length and ahead % abs(offset) == 0:
+            stop = obstacle - offset
+
+        return stop
+
+    def walk(self, obstacle: int | None = None) -> Iterator[Segment]:
+        """
+        The guard's runs until it leaves the map. Raises ValueError if it
+        never does.
+        """
+        pos, direction = self.start, NORTH
+        turns: set[tuple[int, int]] = set()
+        while True:
+            stop = self.stop(pos, direction, obstacle)
+            yield pos, direction, stop
+
+            if self.grid[stop + self.grid.offsets[direction]] == OUTSIDE:
+                return
+
+            pos, direction = stop, (direction + 1) % 4
+            if (pos, direction) in turns:
+                raise ValueError("The guard walks in a loop")
+            turns.add((pos, direction))
+
+    def visited(self) -> Grid:
+        visited = self.grid.empty_like(OPEN)
+        for pos, direction, stop in self.walk():
+            paint(visited, pos, stop, self.grid.offsets[direction])
+
+        return visited
+
+    def loops_with(self, obstacle: int) -> bool:
+        try:
+            for _ in self.walk(obstacle):
+                pass
+        except ValueError:
+            return True
+
+        return False
+
+
+def paint(visited: Grid, pos: int, stop: int, offset: int) -> None:
+    # A run is a slice of the flat cells, with the row width as step for
+    # north and south
+    first, last = min(pos, stop), max(pos, stop)
+    step = abs(offset)
+    visited.cells[first : last + 1 : step] = bytes([VISITED]) * (
+        (last - first) // step + 1
+    )
 
-    data_path = Path(DATA_PATH_STR)
-    maze, tracker = read_maze(data_path)
 
+@cached_parser(version=3)
+def read_lab_grid(path: Path) -> tuple[Grid, int]:
+    grid = Grid.from_file(path, pad_value=OUTSIDE)
+    start = grid.find(GUARD)
+    grid[start] = OPEN
+
+    return grid, start
+
+
+def read_lab(path: Path) -> Lab:
+    # Only the grid is cached, the jump tables are rebuilt as they would take
+    # far more space in the cache than the map itself
+    return Lab(*read_lab_grid(path))
+
+
+def count_potential_loops_jumps(lab: Lab) -> int:
+    visited = lab.visited()
+
+    count = 0
+    for idx in lab.grid.indices():
+        if visited[idx] == VISITED and idx != lab.start:
+            count += int(lab.loops_with(idx))
+
+    return count
+
+
+class LoopChecker:
+    """
+    Loop checks for single extra obstacles on one lab. The (cell, direction)
+    turns seen are stamped with the number of the check, so one array is
+    reused for every check rather than cleared or rebuilt.
+    """
+
+    def __init__(self, lab: Lab) -> None:
+        self.lab = lab
+        self.seen = array("I", bytes(16 * len(lab.grid.cells)))
+        self.epoch = 0
+
+    def loops_from(self, pos: int, direction: int, obstacle: int) -> bool:
+        self.epoch += 1
+        epoch, seen = self.epoch, self.seen
+        lab, grid, offsets = self.lab, self.lab.grid, self.lab.grid.offsets
+
+        while True:
+            stop = lab.stop(pos, direction, obstacle)
+            if grid[stop + offsets[direction]] == OUTSIDE:
+                return False
+
+            pos, direction = stop, (direction + 1) % 4
+            turn = 4 * pos + direction
+            if seen[turn] == epoch:
+                return True
+            seen[turn] = epoch
+
+
+def count_potential_loops_incremental(lab: Lab) -> int:
+    """
+    Follows the guard's own route once. An obstacle on a cell only changes
+    the route from the first time the guard reaches that cell, so each check
+    starts from the step before it rather than from the start.
+    """
+    checker = LoopChecker(lab)
+    reached = bytearray(len(lab.grid.cells))
+    reached[lab.start] = 1
+
+    count = 0
+    for pos, direction, stop in lab.walk():
+        offset = lab.grid.offsets[direction]
+        for idx in range(pos + offset, stop + offset, offset):
+            if reached[idx]:
+                continue
+
+            reached[idx] = 1
+            count += int(checker.loops_from(idx - offset, direction, idx))
+
+    return count
+
+
+def parse_input(path: Path) -> Lab:
+    return read_lab(path)
+
+
+def solve(lab: Lab, part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
-            count = track_to_end_and_count(maze, tracker)
-            tracker.print()
+            visited = lab.visited()
+            count = visited.count(VISITED)
+            visited.print()
 
         case ProblemParts.Part2:
-            count = count_potential_loops(maze, tracker)
+            count = count_potential_loops_incremental(lab)
+
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    data = parse_input(data_path)
 
+    count = solve(data, part)
     print("count:", count)
 
 
@@ -3,13 +3,14 @@ from __future__ import annotations
 from itertools import product
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day7.txt"
 
 Problem = tuple[int, list[int]]
 
 
+@cached_parser(version=1)
 def parse_problems(path: Path) -> list[Problem]:
     problems = []
     with path.open() as f:
@@ -64,12 +65,11 @@ def check_if_solvable_with_concat(target: int, values: list[int]) -> bool:
     return False
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> list[Problem]:
+    return parse_problems(path)
 
-    data_path = Path(DATA_PATH_STR)
-    problems = parse_problems(data_path)
 
+def solve(problems: list[Problem], part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             count = sum(t * int(check_if_solvable(t, vs)) for t, vs in problems)
@@ -80,6 +80,16 @@ def main() -> None:
                 for t, vs in problems
             )
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    problems = parse_input(data_path)
+
+    count = solve(problems, part)
     print("count:", count)
 
 
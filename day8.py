@@ -1,146 +1,102 @@
 from collections import defaultdict
-from functools import partial
-from itertools import filterfalse, permutations
+from itertools import permutations
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from grid import Grid
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day8.txt"
 
 Problem = tuple[int, list[int]]
 
-AntennaMap = dict[str, list[complex]]
-CityDim = tuple[int, int]
+AntennaMap = dict[str, list[tuple[int, int]]]
+EMPTY = ord(".")
+ANTINODE = 1
 
 
-def parse_antenna(path: Path) -> tuple[AntennaMap, CityDim]:
-    row_count = 0
+@cached_parser(version=2)
+def parse_antenna(path: Path) -> tuple[AntennaMap, Grid]:
+    city = Grid.from_file(path, pad_value=EMPTY)
 
     antenna_map = defaultdict(list)
+    for idx in city.indices():
+        v = city[idx]
+        if v != EMPTY:
+            antenna_map[chr(v)].append(city.position(idx))
 
-    with path.open() as f:
-        row = ""
-        for i, row in enumerate(f):
-            row = row.strip()
-            row_count += 1
+    return antenna_map, city
 
-            for j, v in enumerate(row):
-                antenna_map[v].append(complex(i, j))
 
-        col_count = len(row)  #
+def mark_antinode(antinodes: Grid, r: int, c: int) -> bool:
+    if not antinodes.in_bounds(r, c):
+        return False
 
-    # Remove null slot
-    del antenna_map["."]
+    antinodes[antinodes.index(r, c)] = ANTINODE
+    return True
 
-    city_dim = (row_count, col_count)
-    return antenna_map, city_dim
 
-
-def create_antinode_pos_set(antenna_map: AntennaMap) -> set[complex]:
-    antinode_pos = set()
+def create_antinode_grid(antenna_map: AntennaMap, city: Grid) -> Grid:
+    antinodes = city.empty_like()
     for antenna_pos_list in antenna_map.values():
-        for pos1, pos2 in permutations(antenna_pos_list, r=2):
-            delta = pos1 - pos2
-
-            antinode1 = pos1 + delta
-            antinode2 = pos2 - delta
+        for (r1, c1), (r2, c2) in permutations(antenna_pos_list, r=2):
+            dr, dc = r1 - r2, c1 - c2
 
-            antinode_pos.add(antinode1)
-            antinode_pos.add(antinode2)
+            mark_antinode(antinodes, r1 + dr, c1 + dc)
+            mark_antinode(antinodes, r2 - dr, c2 - dc)
 
-    return antinode_pos
+    return antinodes
 
 
-def create_antinode_pos_harmonic_set(
-    antenna_map: AntennaMap, city_dim: CityDim
-) -> set[complex]:
-    antinode_pos = set()
+def create_antinode_harmonic_grid(antenna_map: AntennaMap, city: Grid) -> Grid:
+    antinodes = city.empty_like()
     for antenna_pos_list in antenna_map.values():
-        for pos1, pos2 in permutations(antenna_pos_list, r=2):
-            delta = pos1 - pos2
-
-            for i in range(city_dim[0] + city_dim[1]):
-                antinode_pos.add(pos1 + delta * i)
-
-            for i in range(city_dim[0] + city_dim[1]):
-                antinode_pos.add(pos2 - delta * i)
-
-        if len(antenna_pos_list) > 1:
-            antinode_pos.update(antenna_pos_list)
-
-    return antinode_pos
-
-
-def out_of_bounds(pos: complex, city_dim: CityDim) -> bool:
-    r, c = pos.real, pos.imag
-
-    if r < 0:
-        return True
-    if c < 0:
-        return True
-    if r >= city_dim[0]:
-        return True
-    if c >= city_dim[1]:
-        return True
-
-    return False
+        # Both orders of each pair are visited, so walking one way is enough
+        for (r1, c1), (r2, c2) in permutations(antenna_pos_list, r=2):
+            dr, dc = r1 - r2, c1 - c2
 
+            r, c = r1, c1
+            while mark_antinode(antinodes, r, c):
+                r, c = r + dr, c + dc
 
-def print_city(
-    antenna_map: AntennaMap, city_dim: CityDim, antinodes: set[complex]
-):
-    city = []
-    for _ in range(city_dim[0]):
-        city.append(["."] * city_dim[1])
+    return antinodes
 
-    for k, pos_list in antenna_map.items():
-        for pos in pos_list:
-            r, c = int(pos.real), int(pos.imag)
-            city[r][c] = k
 
-    for pos in antinodes:
-        r, c = int(pos.real), int(pos.imag)
-        city[r][c] = "#"
-
-    print("=" * city_dim[0])
-    for row in city:
-        for v in row:
+def print_city(city: Grid, antinodes: Grid):
+    print("=" * city.n_rows)
+    for r in range(city.n_rows):
+        for c in range(city.n_cols):
+            idx = city.index(r, c)
+            v = "#" if antinodes[idx] == ANTINODE else chr(city[idx])
             print(v, end="")
         print()
-    print("=" * city_dim[0])
+    print("=" * city.n_rows)
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> tuple[AntennaMap, Grid]:
+    return parse_antenna(path)
 
-    data_path = Path(DATA_PATH_STR)
-    antenna_map, city_dim = parse_antenna(data_path)
+
+def solve(data: tuple[AntennaMap, Grid], part: ProblemParts) -> int:
+    antenna_map, city = data
 
     match part:
         case ProblemParts.Part1:
-            antinodes = create_antinode_pos_set(antenna_map)
-            antinodes_in_city = set(
-                filterfalse(
-                    partial(out_of_bounds, city_dim=city_dim), antinodes
-                )
-            )
+            antinodes = create_antinode_grid(antenna_map, city)
+        case ProblemParts.Part2:
+            antinodes = create_antinode_harmonic_grid(antenna_map, city)
 
-            print_city(antenna_map, city_dim, antinodes_in_city)
+    print_city(city, antinodes)
 
-            count = len(antinodes_in_city)
+    return antinodes.count(ANTINODE)
 
-        case ProblemParts.Part2:
-            antinodes = create_antinode_pos_harmonic_set(antenna_map, city_dim)
-            antinodes_in_city = set(
-                filterfalse(
-                    partial(out_of_bounds, city_dim=city_dim), antinodes
-                )
-            )
 
-            print_city(antenna_map, city_dim, antinodes_in_city)
+def main() -> None:
+    part = simple_parser_to_part()
 
-            count = len(antinodes_in_city)
+    data_path = Path(DATA_PATH_STR)
+    data = parse_input(data_path)
 
+    count = solve(data, part)
     print("count:", count)
 
 
@@ -1,11 +1,12 @@
 from itertools import filterfalse
 from pathlib import Path
 
-from utils import ProblemParts, simple_parser_to_part
+from utils import ProblemParts, cached_parser, simple_parser_to_part
 
 DATA_PATH_STR = "data/day9.txt"
 
 
+@cached_parser(version=1)
 def parse_block_code(path: Path) -> str:
     with path.open() as f:
         return f.readline().strip()
@@ -141,12 +142,11 @@ def block_compress_checksum(code: str) -> int:
     return sum(i * v for i, v in enumerate(checksum_str) if v != ".")
 
 
-def main() -> None:
-    part = simple_parser_to_part()
+def parse_input(path: Path) -> str:
+    return parse_block_code(path)
 
-    data_path = Path(DATA_PATH_STR)
-    block_code = parse_block_code(data_path)
 
+def solve(block_code: str, part: ProblemParts) -> int:
     match part:
         case ProblemParts.Part1:
             count = char_compress_checksum(block_code)
@@ -154,6 +154,16 @@ def main() -> None:
         case ProblemParts.Part2:
             count = block_compress_checksum(block_code)
 
+    return count
+
+
+def main() -> None:
+    part = simple_parser_to_part()
+
+    data_path = Path(DATA_PATH_STR)
+    block_code = parse_input(data_path)
+
+    count = solve(block_code, part)
     print("count:", count)
 
 
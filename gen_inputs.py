@@ -0,0 +1,347 @@
+"""
+Synthetic puzzle inputs in each day's format, parameterised by size.
+
+`size` is the number of records for list style inputs (location pairs,
+reports, updates, equations, stones, machines, robots), the number of bytes
+for the corrupted memory and disk map, and the side length for grids.
+"""
+
+import random
+import string
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable
+
+Generator = Callable[[int, random.Random], str]
+
+ANTENNA_FREQS = string.ascii_letters + string.digits
+
+
+def grid_to_str(grid: list[list[str]]) -> str:
+    return "".join("".join(row) + "\n" for row in grid)
+
+
+def gen_day1(size: int, rng: random.Random) -> str:
+    rows = []
+    for _ in range(size):
+        left, right = rng.randint(10_000, 99_999), rng.randint(10_000, 99_999)
+        rows.append(f"{left}   {right}\n")
+
+    return "".join(rows)
+
+
+def gen_day2(size: int, rng: random.Random) -> str:
+    rows = []
+    for _ in range(size):
+        sign = rng.choice([-1, 1])
+        level = [rng.randint(10, 90)]
+        for _ in range(rng.randint(4, 7)):
+            jump = (
+                rng.randint(1, 3) if rng.random() < 0.9 else rng.randint(-3, 5)
+            )
+            level.append(level[-1] + sign * jump)
+
+        rows.append(" ".join(str(v) for v in level) + "\n")
+
+    return "".join(rows)
+
+
+def gen_day3(size: int, rng: random.Random) -> str:
+    # No "m" in the filler so every mul( prefix comes from a token below
+    filler = "ul(),0123456789don't_xy%&[]!@^*+?<> "
+    corrupt = ["mul[3,7]", "mul(4*", "mul ( 2 , 4 )", "mul(6,9!", "?(12,34)"]
+
+    pieces = []
+    n_chars = 0
+    while n_chars < size:
+        roll = rng.random()
+        if roll < 0.05:
+            piece = f"mul({rng.randint(1, 999)},{rng.randint(1, 999)})"
+        elif roll < 0.06:
+            piece = rng.choice(["do()", "don't()"])
+        elif roll < 0.07:
+            piece = rng.choice(corrupt)
+        else:
+            piece = rng.choice(filler)
+
+        pieces.append(piece)
+        n_chars += len(piece)
+
+    # Split into a few long lines like the real input
+    code = "".join(pieces)
+    line_len = 3_000
+    return "".join(
+        code[i : i + line_len] + "\n" for i in range(0, len(code), line_len)
+    )
+
+
+def gen_day4(size: int, rng: random.Random) -> str:
+    grid = [[rng.choice("XMAS") for _ in range(size)] for _ in range(size)]
+    return grid_to_str(grid)
+
+
+def gen_day5(size: int, rng: random.Random) -> str:
+    # A total order over the pages, with a rule for every ordered pair
+    order = rng.sample(range(10, 100), 49)
+    rules = [
+        f"{order[i]}|{order[j]}\n"
+        for i in range(len(order))
+        for j in range(i + 1, len(order))
+    ]
+    rng.shuffle(rules)
+
+    updates = []
+    for _ in range(size):
+        page = rng.sample(order, rng.choice(range(5, 24, 2)))
+        if rng.random() < 0.5:
+            page.sort(key=order.index)
+        updates.append(",".join(str(v) for v in page) + "\n")
+
+    return "".join(rules) + "\n" + "".join(updates)
+
+
+def guard_escapes(grid: list[list[str]], start: tuple[int, int]) -> bool:
+    dirs = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    (r, c), d = start, 0
+    seen = set()
+    while (r, c, d) not in seen:
+        seen.add((r, c, d))
+        nr, nc = r + dirs[d][0], c + dirs[d][1]
+        if not (0 <= nr < len(grid) and 0 <= nc < len(grid[0])):
+            return True
+        if grid[nr][nc] == "#":
+            d = (d + 1) % 4
+        else:
+            r, c = nr, nc
+
+    return False
+
+
+def gen_day6(size: int, rng: random.Random) -> str:
+    # Part 1 never terminates if the guard loops, so only emit mazes it leaves
+    while True:
+        grid = [
+            ["#" if rng.random() < 0.05 else "." for _ in range(size)]
+            for _ in range(size)
+        ]
+        start = (rng.randrange(size), rng.randrange(size))
+        grid[start[0]][start[1]] = "^"
+
+        if guard_escapes(grid, start):
+            return grid_to_str(grid)
+
+
+def gen_day7(size: int, rng: random.Random) -> str:
+    rows = []
+    for _ in range(size):
+        values = [rng.randint(1, 99) for _ in range(rng.randint(3, 8))]
+
+        target = values[0]
+        for v in values[1:]:
+            match rng.randrange(3):
+                case 0:
+                    target *= v
+                case 1:
+                    target += v
+                case _:
+                    target = int(f"{target}{v}")
+
+        # Some equations are not solvable
+        if rng.random() < 0.3:
+            target += 1
+
+        rows.append(f"{target}: {' '.join(str(v) for v in values)}\n")
+
+    return "".join(rows)
+
+
+def gen_day8(size: int, rng: random.Random) -> str:
+    grid = [["."] * size for _ in range(size)]
+    for _ in range(4 * size):
+        grid[rng.randrange(size)][rng.randrange(size)] = rng.choice(
+            ANTENNA_FREQS
+        )
+
+    return grid_to_str(grid)
+
+
+def gen_day9(size: int, rng: random.Random) -> str:
+    # Files are never empty, free space can be
+    code = [
+        str(rng.randint(0, 9) if i % 2 else rng.randint(1, 9))
+        for i in range(size | 1)
+    ]
+    return "".join(code) + "\n"
+
+
+def gen_day10(size: int, rng: random.Random) -> str:
+    grid = [[str(rng.randint(0, 9)) for _ in range(size)] for _ in range(size)]
+
+    # Lay down hiking trails so there is something to find
+    for _ in range(size * size // 20):
+        r, c = rng.randrange(size), rng.randrange(size)
+        for height in range(10):
+            grid[r][c] = str(height)
+            dr, dc = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+            if not (0 <= r + dr < size and 0 <= c + dc < size):
+                break
+            r, c = r + dr, c + dc
+
+    return grid_to_str(grid)
+
+
+def gen_day11(size: int, rng: random.Random) -> str:
+    return " ".join(str(rng.randint(0, 1_000_000)) for _ in range(size)) + "\n"
+
+
+def gen_day12(size: int, rng: random.Random) -> str:
+    plants = string.ascii_uppercase[:8]
+    grid = [[rng.choice(plants) for _ in range(size)] for _ in range(size)]
+
+    # Copy neighbours to grow regions larger than single cells
+    for r in range(size):
+        for c in range(size):
+            if r > 0 and rng.random() < 0.4:
+                grid[r][c] = grid[r - 1][c]
+            elif c > 0 and rng.random() < 0.4:
+                grid[r][c] = grid[r][c - 1]
+
+    return grid_to_str(grid)
+
+
+def gen_day13(size: int, rng: random.Random) -> str:
+    machines = []
+    for _ in range(size):
+        while True:
+            ax, ay = rng.randint(10, 99), rng.randint(10, 99)
+            bx, by = rng.randint(10, 99), rng.randint(10, 99)
+            if ax * by != ay * bx:
+                break
+
+        a, b = rng.randint(1, 100), rng.randint(1, 100)
+        px, py = a * ax + b * bx, a * ay + b * by
+        if rng.random() < 0.5:
+            px += rng.randint(1, 50)
+
+        machines.append(
+            f"Button A: X+{ax}, Y+{ay}\n"
+            f"Button B: X+{bx}, Y+{by}\n"
+            f"Prize: X={px}, Y={py}\n"
+        )
+
+    return "\n".join(machines)
+
+
+def gen_day14(size: int, rng: random.Random) -> str:
+    rows = []
+    for _ in range(size):
+        px, py = rng.randrange(101), rng.randrange(103)
+        vx, vy = rng.randint(-99, 99), rng.randint(-99, 99)
+        rows.append(f"p={px},{py} v={vx},{vy}\n")
+
+    return "".join(rows)
+
+
+def gen_day15(size: int, rng: random.Random) -> str:
+    grid = [["#"] * size for _ in range(size)]
+    for r in range(1, size - 1):
+        for c in range(1, size - 1):
+            roll = rng.random()
+            grid[r][c] = "#" if roll < 0.05 else "O" if roll < 0.3 else "."
+
+    grid[rng.randrange(1, size - 1)][rng.randrange(1, size - 1)] = "@"
+
+    moves = "".join(rng.choice("<>^v") for _ in range(8 * size * size))
+    line_len = 1_000
+    move_rows = "".join(
+        moves[i : i + line_len] + "\n" for i in range(0, len(moves), line_len)
+    )
+
+    return grid_to_str(grid) + "\n" + move_rows
+
+
+def gen_day16(size: int, rng: random.Random) -> str:
+    # Perfect maze on the odd cells, then open a few walls to add loops
+    size = max(size | 1, 5)
+    grid = [["#"] * size for _ in range(size)]
+
+    stack = [(size - 2, 1)]
+    grid[size - 2][1] = "."
+    while stack:
+        r, c = stack[-1]
+        options = [
+            (r + dr, c + dc, r + dr // 2, c + dc // 2)
+            for dr, dc in [(0, 2), (0, -2), (2, 0), (-2, 0)]
+            if 0 < r + dr < size - 1
+            and 0 < c + dc < size - 1
+            and grid[r + dr][c + dc] == "#"
+        ]
+        if not options:
+            stack.pop()
+            continue
+
+        nr, nc, wr, wc = rng.choice(options)
+        grid[wr][wc] = grid[nr][nc] = "."
+        stack.append((nr, nc))
+
+    for _ in range(size * size // 50):
+        r, c = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+        if (r + c) % 2:
+            grid[r][c] = "."
+
+    grid[size - 2][1] = "S"
+    grid[1][size - 2] = "E"
+
+    return grid_to_str(grid)
+
+
+GENERATORS: dict[int, Generator] = {
+    1: gen_day1,
+    2: gen_day2,
+    3: gen_day3,
+    4: gen_day4,
+    5: gen_day5,
+    6: gen_day6,
+    7: gen_day7,
+    8: gen_day8,
+    9: gen_day9,
+    10: gen_day10,
+    11: gen_day11,
+    12: gen_day12,
+    13: gen_day13,
+    14: gen_day14,
+    15: gen_day15,
+    16: gen_day16,
+}
+
+
+def write_input(day: int, size: int, out_dir: Path, seed: int = 0) -> Path:
+    rng = random.Random(f"{day}-{size}-{seed}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    path = out_dir / f"day{day}.txt"
+    path.write_text(GENERATORS[day](size, rng))
+
+    return path
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Generate a synthetic puzzle input.")
+    parser.add_argument("--day", type=int, required=True)
+    parser.add_argument("--size", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--out-dir", type=Path, help="Write dayN.txt here instead of stdout."
+    )
+
+    args = parser.parse_args()
+    if args.out_dir is not None:
+        write_input(args.day, args.size, args.out_dir, args.seed)
+    else:
+        rng = random.Random(f"{args.day}-{args.size}-{args.seed}")
+        sys.stdout.write(GENERATORS[args.day](args.size, rng))
+
+
+if __name__ == "__main__":
+    main()
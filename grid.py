@@ -0,0 +1,128 @@
+"""
+Compact row-major grid shared by the grid based days.
+
+Cells are single bytes in a flat `bytearray`, addressed by an integer index.
+The grid is surrounded by a border of `pad` cells holding `pad_value`, so a
+neighbour is always `idx + grid.offsets[d]` without any bounds checks.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Direction indices, clockwise from north
+NORTH, EAST, SOUTH, WEST = range(4)
+
+
+class Grid:
+    def __init__(
+        self,
+        n_rows: int,
+        n_cols: int,
+        fill: int = 0,
+        pad_value: int = 0,
+        pad: int = 1,
+    ) -> None:
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.pad = pad
+        self.pad_value = pad_value
+
+        self.width = n_cols + 2 * pad
+        self.height = n_rows + 2 * pad
+        self.cells = bytearray([pad_value]) * (self.width * self.height)
+
+        if fill != pad_value:
+            row_fill = bytes([fill]) * n_cols
+            for r in range(n_rows):
+                start = self.index(r, 0)
+                self.cells[start : start + n_cols] = row_fill
+
+        # Index offsets of the neighbour in each direction
+        self.offsets = (-self.width, 1, self.width, -1)
+        self.diagonal_offsets = (
+            -self.width + 1,
+            self.width + 1,
+            self.width - 1,
+            -self.width - 1,
+        )
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[str | bytes], pad_value: int = 0, pad: int = 1
+    ) -> Grid:
+        byte_rows = [
+            (row.encode() if isinstance(row, str) else row).rstrip(b"\r\n")
+            for row in rows
+        ]
+        n_cols = max((len(row) for row in byte_rows), default=0)
+
+        grid = cls(len(byte_rows), n_cols, pad_value, pad_value, pad)
+        for r, row in enumerate(byte_rows):
+            start = grid.index(r, 0)
+            grid.cells[start : start + len(row)] = row
+
+        return grid
+
+    @classmethod
+    def from_file(cls, path: Path, pad_value: int = 0, pad: int = 1) -> Grid:
+        with path.open("rb") as f:
+            return cls.from_rows(f, pad_value, pad)
+
+    def index(self, r: int, c: int) -> int:
+        return (r + self.pad) * self.width + c + self.pad
+
+    def position(self, idx: int) -> tuple[int, int]:
+        r, c = divmod(idx, self.width)
+        return r - self.pad, c - self.pad
+
+    def in_bounds(self, r: int, c: int) -> bool:
+        return 0 <= r < self.n_rows and 0 <= c < self.n_cols
+
+    def indices(self) -> Iterator[int]:
+        for r in range(self.n_rows):
+            start = self.index(r, 0)
+            yield from range(start, start + self.n_cols)
+
+    def find(self, value: int) -> int:
+        for idx in self.indices():
+            if self.cells[idx] == value:
+                return idx
+
+        raise ValueError(f"{chr(value)!r} not in grid")
+
+    def count(self, value: int) -> int:
+        # Padding is excluded when it happens to hold the same value
+        count = self.cells.count(value)
+        if value == self.pad_value:
+            count -= len(self.cells) - self.n_rows * self.n_cols
+
+        return count
+
+    def empty_like(self, fill: int = 0) -> Grid:
+        return Grid(self.n_rows, self.n_cols, fill, fill, self.pad)
+
+    def as_array(self) -> np.ndarray:
+        import numpy as np
+
+        # A view, writes go through to the grid
+        full = np.frombuffer(self.cells, dtype=np.uint8)
+        full = full.reshape(self.height, self.width)
+        pad = self.pad
+
+        return full[pad : pad + self.n_rows, pad : pad + self.n_cols]
+
+    def __getitem__(self, idx: int) -> int:
+        return self.cells[idx]
+
+    def __setitem__(self, idx: int, value: int) -> None:
+        self.cells[idx] = value
+
+    def print(self) -> None:
+        for r in range(self.n_rows):
+            start = self.index(r, 0)
+            print(self.cells[start : start + self.n_cols].decode())
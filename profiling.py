@@ -0,0 +1,97 @@
+"""
+Profilers that can be switched on from the command line of any day.
+
+`cprofile` prints the top functions by cumulative time and optionally dumps
+the raw stats for tools like snakeviz. `sample` interrupts the process every
+`interval` seconds of CPU time and records the Python stack, writing
+collapsed stacks (`outer;inner count`) that flamegraph.pl or speedscope read.
+"""
+
+import atexit
+import signal
+import sys
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+PROFILERS = ["cprofile", "sample"]
+DEFAULT_COLLAPSED_PATH = "profile.collapsed"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.001) -> None:
+        if not hasattr(signal, "setitimer"):
+            raise RuntimeError("Sampling needs signal.setitimer (Unix only)")
+
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+
+    def sample(self, signum: int, frame: FrameType | None) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{Path(code.co_filename).stem}.{code.co_qualname}")
+            frame = frame.f_back
+
+        self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def dump_collapsed(self, path: Path) -> None:
+        with path.open("w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def print_top(self, n: int = 20) -> None:
+        # Self samples, i.e. the innermost frame of each stack
+        leaf_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack[-1]] += count
+
+        total = sum(leaf_counts.values())
+        print(f"{total} samples", file=sys.stderr)
+        for name, count in leaf_counts.most_common(n):
+            print(f"{count / total:>7.1%}  {name}", file=sys.stderr)
+
+
+def start_profiler(kind: str, out_path: Path | None = None) -> None:
+    """
+    Start profiling now and report when the interpreter exits.
+    """
+    match kind:
+        case "cprofile":
+            import cProfile
+            import pstats
+
+            profile = cProfile.Profile()
+
+            def report_cprofile() -> None:
+                profile.disable()
+                stats = pstats.Stats(profile, stream=sys.stderr)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(30)
+                if out_path is not None:
+                    stats.dump_stats(out_path)
+
+            atexit.register(report_cprofile)
+            profile.enable()
+
+        case "sample":
+            sampler = SamplingProfiler()
+            collapsed_path = out_path or Path(DEFAULT_COLLAPSED_PATH)
+
+            def report_sample() -> None:
+                sampler.stop()
+                sampler.print_top()
+                sampler.dump_collapsed(collapsed_path)
+
+            atexit.register(report_sample)
+            sampler.start()
+
+        case _:
+            raise ValueError(f"Unknown profiler {kind!r}")
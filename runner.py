@@ -0,0 +1,190 @@
+import contextlib
+import importlib
+import os
+import re
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+
+from utils import PARSE_CACHE_ENABLE_ENV, ProblemParts
+
+ROOT_PATH = Path(__file__).parent
+DAY_PATTERN = re.compile(r"day(\d+)\.py")
+
+PART_LOOKUP = {
+    1: ProblemParts.Part1,
+    2: ProblemParts.Part2,
+}
+
+
+@dataclass
+class RunResult:
+    day: int
+    part: ProblemParts
+    parse_time: float = 0.0
+    solve_time: float = 0.0
+    peak_rss_kib: int = 0
+    answer: int | None = None
+    error: str | None = None
+
+
+def discover_days() -> list[int]:
+    days = []
+    for path in ROOT_PATH.glob("day*.py"):
+        day_match = DAY_PATTERN.fullmatch(path.name)
+        if day_match is not None:
+            days.append(int(day_match.group(1)))
+
+    return sorted(days)
+
+
+def load_day(day: int) -> ModuleType:
+    return importlib.import_module(f"day{day}")
+
+
+def reset_peak_rss() -> None:
+    # Writing 5 to clear_refs resets VmHWM (Linux >= 4.0), which lets us
+    # measure peak RSS per task rather than for the whole process.
+    with contextlib.suppress(OSError):
+        Path("/proc/self/clear_refs").write_text("5")
+
+
+def peak_rss_kib() -> int:
+    with contextlib.suppress(OSError):
+        for row in Path("/proc/self/status").read_text().splitlines():
+            if row.startswith("VmHWM:"):
+                return int(row.split()[1])
+
+    # Fallback is the high water mark of the whole process
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024
+
+    return peak
+
+
+def data_path_for(module: ModuleType, data_dir: Path | None) -> Path:
+    data_path = Path(module.DATA_PATH_STR)
+    if data_dir is not None:
+        data_path = data_dir / data_path.name
+
+    return data_path
+
+
+def run_part(
+    day: int, part: ProblemParts, data_dir: Path | None = None
+) -> RunResult:
+    result = RunResult(day, part)
+
+    try:
+        module = load_day(day)
+        data_path = data_path_for(module, data_dir)
+
+        reset_peak_rss()
+
+        # Days print debugging output, keep the report readable
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                data = module.parse_input(data_path)
+                result.parse_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                result.answer = module.solve(data, part)
+                result.solve_time = time.perf_counter() - start
+
+        result.peak_rss_kib = peak_rss_kib()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def run_parts(
+    tasks: list[tuple[int, ProblemParts]],
+    data_dir: Path | None = None,
+    jobs: int = 1,
+) -> list[RunResult]:
+    if jobs <= 1:
+        return [run_part(day, part, data_dir) for day, part in tasks]
+
+    # Results are collected in submission order, not completion order
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(run_part, day, part, data_dir)
+            for day, part in tasks
+        ]
+        return [f.result() for f in futures]
+
+
+def print_report(results: list[RunResult]) -> None:
+    header = (
+        f"{'day':>4} {'part':>6} {'parse (s)':>10} {'solve (s)':>10} "
+        f"{'peak rss (MiB)':>15}  answer"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for r in results:
+        answer = r.error if r.error is not None else r.answer
+        print(
+            f"{r.day:>4} {r.part.value:>6} {r.parse_time:>10.4f} "
+            f"{r.solve_time:>10.4f} {r.peak_rss_kib / 1024:>15.1f}  {answer}"
+        )
+
+    total_parse = sum(r.parse_time for r in results)
+    total_solve = sum(r.solve_time for r in results)
+    print("-" * len(header))
+    print(f"{'total':>11} {total_parse:>10.4f} {total_solve:>10.4f}")
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Run several days in one process.")
+    parser.add_argument(
+        "--days", type=int, nargs="+", help="Days to run (default: all)."
+    )
+    parser.add_argument(
+        "--parts", type=int, nargs="+", choices=[1, 2], default=[1, 2]
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        help="Directory holding dayN.txt inputs (default: DATA_PATH_STR).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes to spread (day, part) pairs over.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse inputs from text, ignoring the parsed-input cache.",
+    )
+
+    args = parser.parse_args()
+    if args.no_cache:
+        # Set in the environment so pool workers see it too
+        os.environ[PARSE_CACHE_ENABLE_ENV] = "0"
+
+    days = args.days if args.days else discover_days()
+    parts = [PART_LOOKUP[p] for p in args.parts]
+
+    tasks = [(day, part) for day in days for part in parts]
+
+    start = time.perf_counter()
+    results = run_parts(tasks, args.data_dir, args.jobs)
+    wall_time = time.perf_counter() - start
+
+    print_report(results)
+    print(f"wall clock: {wall_time:.4f}s with {args.jobs} job(s)")
+
+
+if __name__ == "__main__":
+    main()
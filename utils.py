@@ -1,6 +1,26 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
 from argparse import ArgumentParser
 from enum import Enum, auto
-from typing import cast
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, TypeVar, cast
+
+from profiling import PROFILERS, start_profiler
+
+if TYPE_CHECKING:
+    import numpy as np
+
+T = TypeVar("T")
+
+PARSE_CACHE_DIR_ENV = "AOC_PARSE_CACHE_DIR"
+PARSE_CACHE_ENABLE_ENV = "AOC_PARSE_CACHE"
+DEFAULT_PARSE_CACHE_DIR = ".cache/parsed"
 
 
 class ProblemParts(Enum):
@@ -12,10 +32,103 @@ def simple_parser_to_part() -> ProblemParts:
 
     parser = ArgumentParser()
     parser.add_argument("--first-part", action="store_true")
+    parser.add_argument(
+        "--profile",
+        choices=PROFILERS,
+        help="Profile the run with cProfile or a sampling profiler.",
+    )
+    parser.add_argument(
+        "--profile-out",
+        type=Path,
+        help="cProfile stats dump, or collapsed stacks when sampling.",
+    )
 
     args = parser.parse_args()
     part = ProblemParts.Part1 if args.first_part else ProblemParts.Part2
 
     print(f"Calculating result for {part.value}:")
 
+    if args.profile is not None:
+        start_profiler(args.profile, args.profile_out)
+
     return part
+
+
+def parse_cache_enabled() -> bool:
+    return os.environ.get(PARSE_CACHE_ENABLE_ENV, "1") != "0"
+
+
+def file_hash(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "blake2b").hexdigest()[:32]
+
+
+def cached_parser(
+    version: int = 1,
+) -> Callable[[Callable[[Path], T]], Callable[[Path], T]]:
+    """
+    Cache the parsed structure on disk, keyed by the parser, its version and
+    the content hash of the input file. Bump `version` whenever the parser's
+    output changes so stale entries are ignored.
+    """
+
+    def decorator(parse_fn: Callable[[Path], T]) -> Callable[[Path], T]:
+        @functools.wraps(parse_fn)
+        def wrapper(path: Path) -> T:
+            if not parse_cache_enabled():
+                return parse_fn(path)
+
+            cache_dir = Path(
+                os.environ.get(PARSE_CACHE_DIR_ENV, DEFAULT_PARSE_CACHE_DIR)
+            )
+            name = f"{parse_fn.__module__}.{parse_fn.__qualname__}"
+            cache_path = cache_dir / f"{name}-v{version}-{file_hash(path)}.pkl"
+
+            try:
+                with cache_path.open("rb") as f:
+                    return cast(T, pickle.load(f))
+            except OSError:
+                # Not cached yet, or the cache can't be read
+                pass
+            except (pickle.UnpicklingError, EOFError, AttributeError):
+                # Corrupt entry or a class that has since moved, re-parse
+                pass
+
+            res = parse_fn(path)
+
+            # The cache is only an optimisation, a directory that can't be
+            # written must not fail the parse
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                with tmp_path.open("wb") as f:
+                    pickle.dump(res, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                with contextlib.suppress(OSError):
+                    tmp_path.unlink(missing_ok=True)
+
+            return res
+
+        return wrapper
+
+    return decorator
+
+
+def pack_ragged(rows: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rows of varying length as a zero padded 2-D array, plus the length of
+    each row.
+    """
+    import numpy as np
+
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    width = int(lengths.max()) if len(rows) > 0 else 0
+
+    packed = np.zeros((len(rows), width), dtype=np.int64)
+    in_row = np.arange(width) < lengths[:, None]
+    packed[in_row] = np.fromiter(
+        chain.from_iterable(rows), dtype=np.int64, count=int(lengths.sum())
+    )
+
+    return packed, lengths